@@ -447,7 +447,8 @@ class AgentIndex:
             "status": agent.state["status"],
             "priority_score": agent.priority["computed_score"],
             "last_active": agent.timing["last_active"],
-            "tags": agent.metadata["tags"]
+            "tags": agent.metadata["tags"],
+            "triggers": agent.triggers
         }
 
         # Add to by_project index
@@ -481,7 +482,8 @@ class AgentIndex:
             "status": new_status,
             "priority_score": agent.priority["computed_score"],
             "last_active": agent.timing["last_active"],
-            "tags": agent.metadata["tags"]
+            "tags": agent.metadata["tags"],
+            "triggers": agent.triggers
         }
 
         # Update by_status if changed
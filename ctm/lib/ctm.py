@@ -1481,7 +1481,8 @@ def cmd_repair(args) -> int:
                     index_data["agents"][aid] = {
                         "status": status,
                         "project": project,
-                        "title": agent.get("task", {}).get("title", "Unknown")
+                        "title": agent.get("task", {}).get("title", "Unknown"),
+                        "triggers": agent.get("triggers", [])
                     }
                 repairs_made.append(f"Re-indexed {len(missing_from_index)} agent(s)")
                 print(f"  ⚠ Re-indexed {len(missing_from_index)} agent(s)")
@@ -102,6 +102,30 @@ class OllamaEmbeddings:
             pass
         return None
 
+    def embed_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Embed several texts with a single /api/embed request.
+
+        Results line up with texts; falls back to per-text embed() when the
+        batch endpoint is unavailable.
+        """
+        keys = [hashlib.md5(t.encode()).hexdigest() for t in texts]
+        missing = sorted({k: t for k, t in zip(keys, texts) if k not in self._cache}.items())
+        if missing:
+            try:
+                import requests
+                resp = requests.post("http://localhost:11434/api/embed",
+                                     json={"model": self.model, "input": [t for _, t in missing]},
+                                     timeout=60)
+                if resp.status_code == 200:
+                    embs = resp.json().get("embeddings") or []
+                    if len(embs) == len(missing):
+                        for (key, _), emb in zip(missing, embs):
+                            if emb:
+                                self._cache[key] = emb
+            except Exception:
+                pass
+        return [self._cache.get(k) or self.embed(t) for k, t in zip(keys, texts)]
+
 
 def cosine_similarity(a: List[float], b: List[float]) -> float:
     if not a or not b or len(a) != len(b):
@@ -11,9 +11,13 @@ Implements bio-inspired priority calculation based on:
 - Error boost (failed tasks get priority)
 """
 
+import bisect
 import json
 import math
 import os
+import time
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timezone
@@ -22,10 +26,76 @@ from dataclasses import dataclass
 from config import load_config, get_ctm_dir
 from agents import Agent, AgentIndex, get_agent, AgentStatus
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to indented JSON bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write data via temp file + fsync + os.replace so readers never see a partial file."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
 
 # Project context boost when task matches current working directory
 PROJECT_CONTEXT_BOOST = 0.20  # +20% priority for matching project
 
+# Deadline urgency bins: upper bound in hours until deadline -> urgency.
+# Bounds match whole-day thresholds (overdue, <=1, <=3, <=7, <=14 days).
+_URGENCY_HOURS = (0, 48, 96, 192, 360)
+_URGENCY_SCORES = (1.0, 0.95, 0.85, 0.70, 0.55)
+
+# Files/directories that mark a project root
+_PROJECT_MARKERS = frozenset({".git", ".claude", "package.json", "pyproject.toml", "Cargo.toml"})
+
+
+@lru_cache(maxsize=1024)
+def _resolved(path: str) -> Path:
+    """Resolve a project path once; repeat lookups skip the lstat walk."""
+    return Path(path).resolve()
+
+
+def _find_project_root(cwd: str) -> str:
+    """
+    Walk upward from cwd to the first directory containing a project marker.
+
+    Uses one scandir per level instead of a stat per marker. Not memoized:
+    a marker added or removed in any ancestor must be seen.
+    """
+    current = Path(cwd)
+    while current != current.parent:
+        try:
+            with os.scandir(current) as it:
+                names = {entry.name for entry in it}
+        except OSError:
+            names = set()
+        if not _PROJECT_MARKERS.isdisjoint(names):
+            return str(current)
+        current = current.parent
+
+    # No marker found - use cwd as-is
+    return cwd
+
 
 @dataclass
 class SchedulerState:
@@ -48,8 +118,20 @@ class Scheduler:
     def __init__(self):
         self.config = load_config()
         self.state_path = get_ctm_dir() / "scheduler.json"
+
+        # Bind priority weights once; calculate_priority reads plain floats
+        weights = self.config.priority_weights
+        (self._w_urg, self._w_rec, self._w_val,
+         self._w_nov, self._w_usr, self._w_err) = (
+            float(weights["urgency"]), float(weights["recency"]), float(weights["value"]),
+            float(weights["novelty"]), float(weights["user_signal"]), float(weights["error_boost"]))
+        self._halflife = float(self.config.recency_halflife_hours)
         self._state = self._load_state()
         self._index = AgentIndex()
+        context = self._state.get("project_context")
+        self._resolved_context: Optional[Path] = _resolved(context) if context else None
+        self._save_suspended: int = 0
+        self._dirty = False
 
     def _load_state(self) -> Dict[str, Any]:
         """Load scheduler state from file."""
@@ -68,14 +150,37 @@ class Scheduler:
                 }
             }
 
-        with open(self.state_path, 'r') as f:
-            return json.load(f)
+        with open(self.state_path, 'rb') as f:
+            return _loads(f.read())
 
     def _save_state(self) -> None:
         """Save scheduler state to file."""
         self.state_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.state_path, 'w') as f:
-            json.dump(self._state, f, indent=2)
+        _atomic_write_bytes(self.state_path, _dumps(self._state))
+        self._dirty = False
+        _note_own_write(self)
+
+    def _mark_dirty(self) -> None:
+        """Record a state change, saving now unless inside a transaction."""
+        self._dirty = True
+        if not self._save_suspended:
+            self._save_state()
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Group several state changes into a single write.
+
+        Nested transactions are allowed; state is saved once when the
+        outermost transaction exits, and only if something changed.
+        """
+        self._save_suspended += 1
+        try:
+            yield self
+        finally:
+            self._save_suspended -= 1
+            if not self._save_suspended and self._dirty:
+                self._save_state()
 
     # ─────────────────────────────────────────────────────────────────────────
     # Project Context Management (v2.1)
@@ -94,9 +199,12 @@ class Scheduler:
         """
         if project_path:
             # Normalize path
-            project_path = str(Path(project_path).resolve())
+            self._resolved_context = _resolved(project_path)
+            project_path = str(self._resolved_context)
+        else:
+            self._resolved_context = None
         self._state["project_context"] = project_path
-        self._save_state()
+        self._mark_dirty()
 
     def detect_project_context(self) -> Optional[str]:
         """
@@ -104,20 +212,8 @@ class Scheduler:
 
         Returns the project root if detected, None otherwise.
         """
-        cwd = Path.cwd()
-
         # Look for project markers (git, .claude, package.json, etc.)
-        markers = [".git", ".claude", "package.json", "pyproject.toml", "Cargo.toml"]
-
-        current = cwd
-        while current != current.parent:
-            for marker in markers:
-                if (current / marker).exists():
-                    return str(current)
-            current = current.parent
-
-        # No marker found - use cwd as-is
-        return str(cwd)
+        return _find_project_root(os.getcwd())
 
     def is_project_match(self, agent: Agent) -> bool:
         """
@@ -127,24 +223,15 @@ class Scheduler:
         - Agent's project path starts with project context (subdirectory)
         - Agent's project path equals project context exactly
         """
-        project_context = self.get_project_context()
-        if not project_context:
+        if self._resolved_context is None:
             return False
 
         agent_project = agent.context.get("project", "")
         if not agent_project:
             return False
 
-        # Normalize both paths
-        context_path = Path(project_context).resolve()
-        agent_path = Path(agent_project).resolve()
-
         # Check if agent path is same or subdirectory of context
-        try:
-            agent_path.relative_to(context_path)
-            return True
-        except ValueError:
-            return False
+        return _resolved(agent_project).is_relative_to(self._resolved_context)
 
     def get_agents_by_project(self) -> Dict[str, List[str]]:
         """
@@ -180,9 +267,6 @@ class Scheduler:
         - user_signal: Explicit priority hints (-1 to 1)
         - error_boost: Bump for failed tasks (0 or boost value)
         """
-        weights = self.config.priority_weights
-        halflife = self.config.recency_halflife_hours
-
         # Calculate recency decay
         last_active = datetime.fromisoformat(
             agent.timing["last_active"].rstrip("Z")
@@ -191,7 +275,7 @@ class Scheduler:
         hours_since = (now - last_active).total_seconds() / 3600
 
         # Exponential decay: recency = 2^(-hours/halflife)
-        recency = math.pow(2, -hours_since / halflife)
+        recency = math.pow(2, -hours_since / self._halflife)
 
         # Calculate novelty decay (from creation)
         created = datetime.fromisoformat(
@@ -215,21 +299,14 @@ class Scheduler:
         if deadline_str:
             try:
                 deadline = datetime.fromisoformat(deadline_str.rstrip("Z")).replace(tzinfo=timezone.utc)
-                days_until = (deadline - now).days
                 hours_until = (deadline - now).total_seconds() / 3600
 
-                if hours_until <= 0:
-                    urgency = 1.0  # Overdue - maximum urgency
-                elif days_until <= 1:
-                    urgency = 0.95  # Due today/tomorrow
-                elif days_until <= 3:
-                    urgency = 0.85  # Critical - within 3 days
-                elif days_until <= 7:
-                    urgency = 0.70  # Soon - within a week
-                elif days_until <= 14:
-                    urgency = 0.55  # Coming up - within 2 weeks
+                idx = bisect.bisect_left(_URGENCY_HOURS, hours_until)
+                if idx < len(_URGENCY_SCORES):
+                    urgency = _URGENCY_SCORES[idx]
                 else:
                     # Gradual decay for longer deadlines
+                    days_until = hours_until // 24
                     urgency = max(0.3, 0.5 * (30 / max(30, days_until)))
             except (ValueError, TypeError):
                 # Invalid deadline format, fall back to default
@@ -242,12 +319,12 @@ class Scheduler:
 
         # Calculate weighted sum
         score = (
-            weights["urgency"] * urgency +
-            weights["recency"] * recency +
-            weights["value"] * value +
-            weights["novelty"] * novelty +
-            weights["user_signal"] * user_signal_normalized +
-            weights["error_boost"] * error_boost
+            self._w_urg * urgency +
+            self._w_rec * recency +
+            self._w_val * value +
+            self._w_nov * novelty +
+            self._w_usr * user_signal_normalized +
+            self._w_err * error_boost
         )
 
         # v2.1: Project context boost
@@ -269,53 +346,61 @@ class Scheduler:
         if project_path:
             self.set_project_context(project_path)
 
-        active_ids = self._index.get_all_active()
-        queue = []
-
-        for agent_id in active_ids:
+        # Load each active agent once; blocker checks below are dict lookups
+        agents: Dict[str, Agent] = {}
+        for agent_id in self._index.get_all_active():
             agent = get_agent(agent_id)
             if agent and agent.state["status"] != AgentStatus.COMPLETED.value:
-                # IMPROVEMENT 2: Task dependency enforcement
-                # Check if agent is blocked by unresolved dependencies
-                blockers = agent.task.get("blockers", [])
-                is_blocked = False
-
-                if blockers:
-                    for blocker_id in blockers:
-                        blocker = get_agent(blocker_id)
-                        if blocker and blocker.state["status"] not in (
-                            AgentStatus.COMPLETED.value,
-                            AgentStatus.CANCELLED.value
-                        ):
-                            is_blocked = True
-                            break
-
-                    if is_blocked:
-                        # Mark as blocked and skip from active queue
-                        if agent.state["status"] != AgentStatus.BLOCKED.value:
-                            agent.set_status(AgentStatus.BLOCKED)
-                            agent.save()
-                            self._index.update(agent)
-                        continue
-                    else:
-                        # Blockers resolved - unblock if was blocked
-                        if agent.state["status"] == AgentStatus.BLOCKED.value:
-                            agent.set_status(AgentStatus.PAUSED)
-                            agent.save()
-                            self._index.update(agent)
-
-                score = self.calculate_priority(agent)
-                queue.append((agent_id, score))
-
-                # Update agent's computed score
-                agent.priority["computed_score"] = score
-                agent.save()
+                agents[agent_id] = agent
+        statuses = {agent_id: agent.state["status"] for agent_id, agent in agents.items()}
+        resolved = (AgentStatus.COMPLETED.value, AgentStatus.CANCELLED.value)
+
+        def is_unresolved(blocker_id: str) -> bool:
+            status = statuses.get(blocker_id)
+            if status is None:
+                # Not an active agent - fall back to the index entry
+                info = self._index.get_info(blocker_id)
+                if not info:
+                    return False
+                status = info["status"]
+            return status not in resolved
+
+        queue = []
+        status_changed: List[Agent] = []
+
+        for agent_id, agent in agents.items():
+            # IMPROVEMENT 2: Task dependency enforcement
+            # Check if agent is blocked by unresolved dependencies
+            blockers = agent.task.get("blockers", [])
+            if blockers:
+                if any(is_unresolved(blocker_id) for blocker_id in blockers):
+                    # Mark as blocked and skip from active queue
+                    if agent.state["status"] != AgentStatus.BLOCKED.value:
+                        agent.set_status(AgentStatus.BLOCKED)
+                        agent.save()
+                        status_changed.append(agent)
+                    continue
+                elif agent.state["status"] == AgentStatus.BLOCKED.value:
+                    # Blockers resolved - unblock (saved with the score below)
+                    agent.set_status(AgentStatus.PAUSED)
+                    status_changed.append(agent)
+
+            score = self.calculate_priority(agent)
+            queue.append((agent_id, score))
+
+            # Update agent's computed score
+            agent.priority["computed_score"] = score
+            agent.save()
+
+        # Only genuine status transitions touch the index
+        for agent in status_changed:
+            self._index.update(agent)
 
         # Sort by score descending
         queue.sort(key=lambda x: x[1], reverse=True)
 
         self._state["priority_queue"] = queue
-        self._save_state()
+        self._mark_dirty()
 
         return queue
 
@@ -374,7 +459,7 @@ class Scheduler:
                 agent.save()
                 self._index.update(agent)
 
-        self._save_state()
+        self._mark_dirty()
 
     def switch_to(self, agent_id: str) -> bool:
         """Switch to a specific agent."""
@@ -382,8 +467,9 @@ class Scheduler:
         if not agent:
             return False
 
-        self.set_active(agent_id)
-        self.rebuild_queue()
+        with self._transaction():
+            self.set_active(agent_id)
+            self.rebuild_queue()
         return True
 
     def preempt_check(self, current_agent_id: str) -> Optional[str]:
@@ -423,30 +509,32 @@ class Scheduler:
             project_path: Optional project path for context-aware prioritization.
                           If not provided, auto-detects from current directory.
         """
-        self._state["session"] = {
-            "started_at": datetime.now(timezone.utc).isoformat(),
-            "switches": 0,
-            "checkpoints": 0,
-            "consolidations": 0
-        }
+        with self._transaction():
+            self._state["session"] = {
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "switches": 0,
+                "checkpoints": 0,
+                "consolidations": 0
+            }
 
-        # v2.1: Set project context
-        if project_path:
-            self.set_project_context(project_path)
-        else:
-            # Auto-detect from cwd
-            detected = self.detect_project_context()
-            if detected:
-                self.set_project_context(detected)
+            # v2.1: Set project context
+            if project_path:
+                self.set_project_context(project_path)
+            else:
+                # Auto-detect from cwd
+                detected = self.detect_project_context()
+                if detected:
+                    self.set_project_context(detected)
 
-        self.rebuild_queue()
-        self._save_state()
+            self.rebuild_queue()
+            self._mark_dirty()
 
     def end_session(self) -> Dict[str, Any]:
         """End the current session and return stats."""
-        stats = self._state["session"].copy()
-        self._state["active_agent"] = None
-        self._save_state()
+        with self._transaction():
+            stats = self._state["session"].copy()
+            self._state["active_agent"] = None
+            self._mark_dirty()
         return stats
 
     def get_queue(self) -> List[Dict[str, Any]]:
@@ -488,7 +576,32 @@ class Scheduler:
 
 # Singleton cache for scheduler
 _scheduler_instance: Optional[Scheduler] = None
-_scheduler_mtime: Optional[float] = None
+_scheduler_mtime: Optional[int] = None
+_last_check_time: float = 0.0
+
+# Minimum seconds between stat() checks for external writes to scheduler.json
+_MTIME_CHECK_INTERVAL = 0.5
+
+
+def _state_mtime_ns(state_path: Path) -> Optional[int]:
+    """Get the state file's mtime in nanoseconds, or None if missing."""
+    try:
+        return os.stat(state_path, follow_symlinks=False).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _note_own_write(scheduler: Scheduler) -> None:
+    """
+    Record a write made by the cached scheduler itself.
+
+    Keeps the cached mtime in step with our own saves so only external
+    writers trigger a reload.
+    """
+    global _scheduler_mtime, _last_check_time
+    if scheduler is _scheduler_instance:
+        _scheduler_mtime = _state_mtime_ns(scheduler.state_path)
+        _last_check_time = time.monotonic()
 
 
 def get_scheduler(force_reload: bool = False) -> Scheduler:
@@ -499,13 +612,20 @@ def get_scheduler(force_reload: bool = False) -> Scheduler:
     - It hasn't been loaded yet
     - force_reload=True is passed
     - The underlying state file has been modified externally
+      (checked at most every _MTIME_CHECK_INTERVAL seconds)
     """
-    global _scheduler_instance, _scheduler_mtime
+    global _scheduler_instance, _scheduler_mtime, _last_check_time
+
+    if (not force_reload and
+            _scheduler_instance is not None and
+            time.monotonic() - _last_check_time < _MTIME_CHECK_INTERVAL):
+        return _scheduler_instance
 
     state_path = get_ctm_dir() / "scheduler.json"
 
     # Check if we need to reload
-    current_mtime = state_path.stat().st_mtime if state_path.exists() else None
+    current_mtime = _state_mtime_ns(state_path)
+    _last_check_time = time.monotonic()
 
     if (force_reload or
         _scheduler_instance is None or
@@ -518,7 +638,12 @@ def get_scheduler(force_reload: bool = False) -> Scheduler:
 
 
 def invalidate_scheduler_cache() -> None:
-    """Invalidate the scheduler cache, forcing a reload on next access."""
-    global _scheduler_instance, _scheduler_mtime
+    """
+    Invalidate the scheduler cache, forcing a reload on next access.
+
+    Call after changing priority config: weights are bound at Scheduler init.
+    """
+    global _scheduler_instance, _scheduler_mtime, _last_check_time
     _scheduler_instance = None
     _scheduler_mtime = None
+    _last_check_time = 0.0
@@ -16,11 +16,44 @@ from typing import Dict, List, Optional
 from config import get_ctm_dir
 from agents import get_agent, Agent
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 SNAPSHOTS_DIR = "snapshots"
 MAX_SNAPSHOTS_PER_AGENT = 5  # Keep last N snapshots per agent
 
 
+def _dumps(obj) -> bytes:
+    """Serialize to indented JSON bytes, using orjson when installed.
+
+    orjson serializes SessionSnapshot dataclasses directly.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, default=asdict).encode("utf-8")
+
+
+def _loads(data: bytes):
+    """Parse JSON bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write data via temp file + fsync + os.replace so readers never see a partial file."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
 @dataclass
 class SessionSnapshot:
     """Captures session state for resume context."""
@@ -108,16 +141,14 @@ def get_uncommitted_files(project_path: Optional[str] = None) -> List[str]:
         result = subprocess.run(
             cmd,
             capture_output=True,
-            text=True,
             cwd=project_path,
             timeout=5
         )
         if result.returncode == 0:
-            files = []
-            for line in result.stdout.strip().split('\n'):
-                if line and len(line) > 3:
-                    files.append(line[3:].strip())
-            return files[:10]  # Cap at 10 files
+            # "XY path" lines; only decode the filenames we keep (cap at 10).
+            # stdout is not stripped: that would eat the first line's status column.
+            lines = result.stdout.splitlines()
+            return [ln[3:].decode("utf-8", "replace") for ln in lines[:10] if len(ln) > 3]
     except Exception:
         pass
     return []
@@ -222,8 +253,8 @@ def save_snapshot(snapshot: SessionSnapshot) -> None:
     snapshots = []
     if path.exists():
         try:
-            with open(path) as f:
-                data = json.load(f)
+            with open(path, 'rb') as f:
+                data = _loads(f.read())
                 if isinstance(data, list):
                     snapshots = data
                 else:
@@ -232,15 +263,14 @@ def save_snapshot(snapshot: SessionSnapshot) -> None:
         except Exception:
             pass
 
-    # Add new snapshot
-    snapshots.append(snapshot.to_dict())
+    # Add new snapshot (serialized directly from the dataclass)
+    snapshots.append(snapshot)
 
     # Keep only last N snapshots
     snapshots = snapshots[-MAX_SNAPSHOTS_PER_AGENT:]
 
     # Save
-    with open(path, 'w') as f:
-        json.dump(snapshots, f, indent=2)
+    _atomic_write_bytes(path, _dumps(snapshots))
 
 
 def load_snapshot(agent_id: str) -> Optional[SessionSnapshot]:
@@ -251,8 +281,8 @@ def load_snapshot(agent_id: str) -> Optional[SessionSnapshot]:
         return None
 
     try:
-        with open(path) as f:
-            data = json.load(f)
+        with open(path, 'rb') as f:
+            data = _loads(f.read())
             if isinstance(data, list) and data:
                 return SessionSnapshot.from_dict(data[-1])
             elif isinstance(data, dict):
@@ -271,8 +301,8 @@ def load_all_snapshots(agent_id: str) -> List[SessionSnapshot]:
         return []
 
     try:
-        with open(path) as f:
-            data = json.load(f)
+        with open(path, 'rb') as f:
+            data = _loads(f.read())
             if isinstance(data, list):
                 return [SessionSnapshot.from_dict(s) for s in data]
             elif isinstance(data, dict):
@@ -299,8 +329,8 @@ def get_recent_snapshots(limit: int = 5) -> List[SessionSnapshot]:
 
     for path in snapshots_dir.glob("*.json"):
         try:
-            with open(path) as f:
-                data = json.load(f)
+            with open(path, 'rb') as f:
+                data = _loads(f.read())
                 if isinstance(data, list) and data:
                     all_snapshots.append(SessionSnapshot.from_dict(data[-1]))
                 elif isinstance(data, dict):
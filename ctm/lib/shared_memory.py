@@ -29,17 +29,70 @@ Architecture:
     └─────────┘            └─────────┘
 """
 
+import asyncio
+import atexit
 import json
 import hashlib
+import mmap
+import os
+import queue
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Set, Callable
+from typing import Optional, List, Dict, Any, Set, Callable, Tuple
 from datetime import datetime, timezone
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from threading import Lock
 
 from config import load_config, get_ctm_dir
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+
+# Compact the append-only log once it outgrows 2x the snapshot (with a floor
+# so small pools aren't rewritten on every write)
+COMPACT_MIN_LOG_BYTES = 64 * 1024
+
+# Fragments are partitioned into this many shards, each with its own files and lock
+NUM_SHARDS = 16
+FLUSH_INTERVAL_MS = 50  # Coalesce log writes arriving within this window
+
+_iso_second_cache = (None, "")  # (unix second, "YYYY-MM-DDTHH:MM:SS")
+
+
+def _utc_iso(now_ns: Optional[int] = None) -> str:
+    """
+    Format a UTC timestamp exactly like datetime.now(timezone.utc).isoformat().
+
+    The date/time prefix is formatted once per second and reused.
+    """
+    global _iso_second_cache
+    if now_ns is None:
+        now_ns = time.time_ns()
+    second, nanos = divmod(now_ns, 1_000_000_000)
+    cached_second, prefix = _iso_second_cache
+    if second != cached_second:
+        prefix = datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        _iso_second_cache = (second, prefix)
+    micros = nanos // 1000
+    if micros:
+        return f"{prefix}.{micros:06d}+00:00"
+    return f"{prefix}+00:00"
+
 
 class FragmentType(str, Enum):
     """Types of memory fragments."""
@@ -58,14 +111,14 @@ class AccessLevel(str, Enum):
     PUBLIC = "public"        # All agents
 
 
-@dataclass
+@dataclass(slots=True)
 class Provenance:
     """Tracks origin and history of a fragment."""
     created_by: str           # Agent ID
     created_at: str           # ISO timestamp
     modified_by: List[str] = field(default_factory=list)
     modified_at: List[str] = field(default_factory=list)
-    accessed_by: List[str] = field(default_factory=list)
+    accessed_by: Set[str] = field(default_factory=set)  # Stored as a sorted list
     source_files: List[str] = field(default_factory=list)
 
     def to_dict(self) -> dict:
@@ -74,7 +127,7 @@ class Provenance:
             "created_at": self.created_at,
             "modified_by": self.modified_by,
             "modified_at": self.modified_at,
-            "accessed_by": self.accessed_by,
+            "accessed_by": sorted(self.accessed_by),
             "source_files": self.source_files
         }
 
@@ -85,12 +138,12 @@ class Provenance:
             created_at=d["created_at"],
             modified_by=d.get("modified_by", []),
             modified_at=d.get("modified_at", []),
-            accessed_by=d.get("accessed_by", []),
+            accessed_by=set(d.get("accessed_by", ())),
             source_files=d.get("source_files", [])
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class MemoryFragment:
     """A unit of shared memory."""
     id: str
@@ -131,7 +184,7 @@ class MemoryFragment:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Subscription:
     """A subscription to memory updates."""
     agent_id: str
@@ -139,6 +192,328 @@ class Subscription:
     filter_tags: Optional[List[str]] = None
     filter_project: Optional[str] = None
     callback: Optional[Callable[[MemoryFragment], None]] = None
+    _match: Callable[[MemoryFragment], bool] = field(init=False, repr=False, compare=False)
+    _loop: Optional[asyncio.AbstractEventLoop] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._match = self._compile_filter()
+
+    def _compile_filter(self) -> Callable[[MemoryFragment], bool]:
+        """Build the filter predicate once instead of re-checking each filter per publish."""
+        types = frozenset(self.filter_types) if self.filter_types else None
+        tags = frozenset(self.filter_tags) if self.filter_tags else None
+        project = self.filter_project or None
+
+        def match(fragment: MemoryFragment) -> bool:
+            return ((types is None or fragment.type in types) and
+                    (tags is None or not tags.isdisjoint(fragment.tags)) and
+                    (project is None or fragment.project == project))
+
+        return match
+
+
+class ReadWriteLock:
+    """
+    Readers-writer lock.
+
+    Any number of readers may hold the lock at once; a writer gets it
+    exclusively. The first reader in takes the writer lock on behalf of
+    all readers and the last one out releases it.
+    """
+
+    def __init__(self):
+        self._readers = 0
+        self._readers_lock = Lock()
+        self._writer_lock = Lock()
+
+    @contextmanager
+    def gen_rlock(self):
+        with self._readers_lock:
+            self._readers += 1
+            if self._readers == 1:
+                self._writer_lock.acquire()
+        try:
+            yield
+        finally:
+            with self._readers_lock:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._writer_lock.release()
+
+    @contextmanager
+    def gen_wlock(self):
+        with self._writer_lock:
+            yield
+
+
+class _Shard:
+    """
+    One partition of a pool's fragments.
+
+    Each shard has its own snapshot, append-only log and lock, so a write
+    only rewrites (on compaction) and blocks the fragments in its shard.
+    Appended records are buffered and written by the pool's writer thread.
+
+    The snapshot is a blob of concatenated fragment JSON plus an offset
+    index. The blob is memory-mapped and a fragment is only parsed when
+    first touched; the index also carries each fragment's type, project
+    and tags so the pool indexes can be rebuilt without parsing the blob.
+    """
+
+    def __init__(self, pool_dir: Path, pool_id: str, index: int,
+                 on_dirty: Callable[[], None]):
+        self.pool_dir = pool_dir
+        self.blob_prefix = f"{pool_id}.shard{index}"
+        self.index_path = pool_dir / f"{pool_id}.shard{index}.idx"
+        self.legacy_path = pool_dir / f"{pool_id}.shard{index}.json"
+        self.log_path = pool_dir / f"{pool_id}.shard{index}.log"
+        self.fragments: Dict[str, dict] = {}  # Parsed fragments; shadow the snapshot
+        self._offsets: Dict[str, Tuple[int, int]] = {}  # fid -> (offset, length) in the blob
+        self._meta: Dict[str, dict] = {}  # fid -> {"type", "project", "tags"} from the index
+        self._frag_cache: Dict[str, MemoryFragment] = {}  # Decoded fragments
+        self.writes = 0
+        self.rwlock = ReadWriteLock()
+        self._blob_name: Optional[str] = None
+        self._mm: Any = b""  # mmap of the blob (bytes when empty)
+        self._log = None  # Opened lazily in append mode
+        self._pending: List[bytes] = []  # Serialized records not yet on disk
+        self._on_dirty = on_dirty
+        self._snapshot_size = 0
+
+    def load(self) -> None:
+        """Map the shard snapshot, then replay its log on top."""
+        missing_blob = None
+        while self.index_path.exists():
+            with open(self.index_path, 'rb') as f:
+                data = _loads(f.read())
+            try:
+                self._map_blob(data["blob"])
+            except FileNotFoundError:
+                # Another instance compacted between reading the index and
+                # opening its blob; its new index names the new blob
+                if data["blob"] == missing_blob:
+                    raise
+                missing_blob = data["blob"]
+                continue
+            self.writes = data.get("writes", 0)
+            for fid, (offset, length, ftype, project, tags) in data.get("index", {}).items():
+                self._offsets[fid] = (offset, length)
+                self._meta[fid] = {"type": ftype, "project": project, "tags": tags}
+            break
+
+        # JSON snapshots from before the blob format are converted once
+        legacy = self.legacy_path.exists()
+        if legacy:
+            with open(self.legacy_path, 'rb') as f:
+                data = _loads(f.read())
+            self.fragments = data.get("fragments", {})
+            self.writes = data.get("writes", len(self.fragments))
+
+        for record in _read_log(self.log_path):
+            self.apply(record)
+
+        if legacy:
+            self.compact()
+            self.legacy_path.unlink()
+
+    def _map_blob(self, blob_name: str) -> None:
+        """Memory-map a snapshot blob for lazy fragment parsing. The current map is kept if it fails."""
+        with open(self.pool_dir / blob_name, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            # Empty files cannot be mapped
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._blob_name = blob_name
+        self._snapshot_size = size
+        self._mm = mm
+
+    def raw(self, fragment_id: str) -> Optional[dict]:
+        """Get a fragment's dict, parsing it out of the blob on first touch."""
+        fdata = self.fragments.get(fragment_id)
+        if fdata is None:
+            span = self._offsets.get(fragment_id)
+            if span is None:
+                return None
+            offset, length = span
+            fdata = _loads(self._mm[offset:offset + length])
+            fdata = self.fragments.setdefault(fragment_id, fdata)
+        return fdata
+
+    def index_items(self):
+        """Yield (fid, data) with at least type, project and tags for every fragment."""
+        yield from self.fragments.items()
+        for fid, meta in self._meta.items():
+            if fid not in self.fragments:
+                yield fid, meta
+
+    def apply(self, record: Dict[str, Any]) -> None:
+        """Apply one log record to the in-memory fragments."""
+        op = record.get("op")
+        if op in ("put", "update"):
+            self._frag_cache.pop(record["id"], None)
+        if op == "put":
+            if record["id"] not in self.fragments and record["id"] not in self._offsets:
+                self.writes += 1  # Otherwise already folded into the snapshot
+            self.fragments[record["id"]] = record["frag"]
+        elif op == "update":
+            self.fragments[record["id"]] = record["frag"]
+        elif op == "access":
+            for fid, readers in record.get("accessed", {}).items():
+                fdata = self.raw(fid)
+                if fdata:
+                    self._frag_cache.pop(fid, None)
+                    accessed_by = fdata["provenance"].setdefault("accessed_by", [])
+                    seen = set(accessed_by)
+                    accessed_by.extend(r for r in readers if r not in seen)
+
+    def get(self, fragment_id: str) -> Optional[MemoryFragment]:
+        """Get a decoded fragment, reusing the cached object. Caller holds a lock."""
+        fragment = self._frag_cache.get(fragment_id)
+        if fragment is None:
+            fdata = self.raw(fragment_id)
+            if fdata is None:
+                return None
+            fragment = MemoryFragment.from_dict(fdata)
+            self._frag_cache[fragment_id] = fragment
+        return fragment
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Buffer one record for the log (O(1) bytes per op). Caller holds the write lock."""
+        self._pending.append(_dumps(record) + b"\n")
+        self._on_dirty()
+
+    def write_pending(self) -> None:
+        """Write buffered records to the log in one go. Caller holds the write lock."""
+        if not self._pending:
+            return
+        self._log = _open_log(self._log, self.log_path)
+        self._log.write(b"".join(self._pending))
+        self._log.flush()
+        self._pending.clear()
+
+        if self._log.tell() > max(2 * self._snapshot_size, COMPACT_MIN_LOG_BYTES):
+            self.compact()
+
+    def commit(self, record: Dict[str, Any], fragment: Optional[MemoryFragment] = None) -> None:
+        """
+        Apply a record in memory and append it to the log. Caller holds the write lock.
+
+        If given, fragment is the decoded form of the record and is cached.
+        """
+        self.apply(record)
+        if fragment is not None:
+            self._frag_cache[record["id"]] = fragment
+        self.append(record)
+
+    def compact(self) -> None:
+        """Fold the log into a fresh snapshot and drop it. Caller holds the write lock."""
+        if self.fragments or self._offsets or self.index_path.exists():
+            self._write_snapshot()
+        self._pending.clear()  # Already folded into the snapshot
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        self.log_path.unlink(missing_ok=True)
+
+    def _write_snapshot(self) -> None:
+        """
+        Write a new blob generation and its index, then switch to it.
+
+        Untouched fragments are copied from the old blob without parsing.
+        The index is replaced atomically after the blob is complete, so a
+        crash leaves the previous generation intact.
+        """
+        chunks: List[bytes] = []
+        index: Dict[str, list] = {}
+        offset = 0
+
+        def add(fid: str, data: bytes, ftype: str, project: Optional[str], tags: List[str]) -> None:
+            nonlocal offset
+            chunks.append(data)
+            index[fid] = [offset, len(data), ftype, project, tags]
+            offset += len(data)
+
+        for fid, fdata in self.fragments.items():
+            add(fid, _dumps(fdata), fdata.get("type", "unknown"), fdata.get("project"), fdata.get("tags", []))
+        for fid, (start, length) in self._offsets.items():
+            if fid not in self.fragments:
+                meta = self._meta[fid]
+                add(fid, bytes(self._mm[start:start + length]), meta["type"], meta["project"], meta["tags"])
+
+        # A fresh name per snapshot: other instances may still have the
+        # current blob (or one written concurrently) mapped
+        fd, blob_path = tempfile.mkstemp(prefix=f"{self.blob_prefix}.", suffix=".bin", dir=self.pool_dir)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b"".join(chunks))
+        blob_name = os.path.basename(blob_path)
+        _write_json_atomic(self.index_path, {"blob": blob_name, "writes": self.writes, "index": index})
+
+        old_blob = self._blob_name
+        self._offsets = {fid: (entry[0], entry[1]) for fid, entry in index.items()}
+        self._meta = {fid: {"type": e[2], "project": e[3], "tags": e[4]} for fid, e in index.items()}
+        self.fragments = {}  # Now served from the new blob
+        self._map_blob(blob_name)
+        if old_blob:
+            (self.pool_dir / old_blob).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Release the log handle. Caller holds the write lock."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+def _dumps(obj) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode("utf-8")
+
+
+def _loads(data: bytes):
+    """Parse JSON bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _write_json_atomic(path: Path, obj: Any) -> None:
+    """Write compact JSON via temp file + os.replace so readers never see a partial file."""
+    # Unique temp name, so concurrent writers never truncate each other's file
+    fd, tmp_path = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(_dumps(obj))
+    os.replace(tmp_path, path)
+
+
+def _open_log(log, log_path: Path):
+    """
+    Return an append handle for log_path, reusing log if it is still that file.
+
+    Another instance of the pool may have compacted and removed the log;
+    appending to the old handle would write into the unlinked file.
+    """
+    if log is not None:
+        try:
+            if os.stat(log_path).st_ino == os.fstat(log.fileno()).st_ino:
+                return log
+        except FileNotFoundError:
+            pass
+        log.close()
+    return open(log_path, 'ab')
+
+
+def _read_log(log_path: Path):
+    """Yield records from an append-only JSONL log, skipping torn lines."""
+    if not log_path.exists():
+        return
+    with open(log_path, 'rb') as f:
+        for line in f:
+            try:
+                yield _loads(line)
+            except ValueError:
+                continue  # Torn trailing line from an interrupted write
 
 
 class SharedMemoryPool:
@@ -150,6 +525,10 @@ class SharedMemoryPool:
     - Pub/Sub for synchronization
     - Version tracking for coherence
     - Project and tag-based grouping
+
+    Fragments are partitioned into NUM_SHARDS shards by id. The project and
+    tag indexes are pool-wide, rebuilt from the shards on load, and guarded
+    by the pool lock.
     """
 
     def __init__(self, pool_id: Optional[str] = None):
@@ -157,37 +536,281 @@ class SharedMemoryPool:
         self.pool_id = pool_id or "default"
         self.pool_dir = self.ctm_dir / "shared_memory"
         self.pool_path = self.pool_dir / f"{self.pool_id}.json"
-        self._state = self._load_state()
+        self.log_path = self.pool_dir / f"{self.pool_id}.log"
+        self._log = None  # Opened lazily in append mode
+        self._pending_log: List[bytes] = []  # Serialized pool records not yet on disk
+        self._shards = [
+            _Shard(self.pool_dir, self.pool_id, i, self._schedule_write)
+            for i in range(NUM_SHARDS)
+        ]
+        self._dirty_event = threading.Event()
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_stop: Optional[threading.Event] = None  # Set by close() to end that thread
+        self._pending_reads = 0
+        self._pending_access: Dict[str, Set[str]] = {}  # fid -> new readers
         self._subscriptions: List[Subscription] = []
-        self._lock = Lock()
+        self._notify_q: "queue.Queue[Optional[MemoryFragment]]" = queue.Queue()  # None stops the worker
+        self._notify_thread: Optional[threading.Thread] = None
+        self._notify_lock = Lock()
+        self._rwlock = ReadWriteLock()
+        self._stats_lock = Lock()  # Guards the pending read counters only
+        self._state = self._load_state()
+        atexit.register(self.close)
+
+    def _shard_for(self, fragment_id: str) -> _Shard:
+        """Route a fragment id to its shard by the id's trailing hex digits."""
+        try:
+            index = int(fragment_id[-2:], 16)
+        except ValueError:
+            # Generated ids always end in hex, so such an id is never stored
+            index = zlib.crc32(fragment_id.encode())
+        return self._shards[index % NUM_SHARDS]
+
+    def _get_visible(self, fragment_id: str, agent_id: str) -> Optional[MemoryFragment]:
+        """
+        Get a decoded fragment if agent_id may access it.
+
+        Private fragments of other agents are rejected from the raw dict,
+        so they are never decoded.
+        """
+        shard = self._shard_for(fragment_id)
+        with shard.rwlock.gen_rlock():
+            if fragment_id not in shard._frag_cache:
+                fdata = shard.raw(fragment_id)
+                if fdata is None:
+                    return None
+                if (fdata["access"] == AccessLevel.PRIVATE.value and
+                        fdata["provenance"]["created_by"] != agent_id):
+                    return None
+            fragment = shard.get(fragment_id)
+
+        return fragment if self._can_access(fragment, agent_id) else None
+
+    def _get_visible_raw(self, fragment_id: str, agent_id: str) -> Optional[dict]:
+        """Get a fragment's raw dict if agent_id may access it, without decoding it."""
+        shard = self._shard_for(fragment_id)
+        with shard.rwlock.gen_rlock():
+            fdata = shard.raw(fragment_id)
+        if fdata is None:
+            return None
+        if (fdata["access"] == AccessLevel.PRIVATE.value and
+                fdata["provenance"]["created_by"] != agent_id):
+            return None
+        return fdata
 
     def _load_state(self) -> Dict[str, Any]:
+        """Load pool metadata and all shards, then rebuild the indexes."""
         self.pool_dir.mkdir(parents=True, exist_ok=True)
         if not self.pool_path.exists():
-            return {
-                "version": "1.0.0",
+            state = {
+                "version": "2.0.0",
                 "pool_id": self.pool_id,
-                "fragments": {},
-                "projects": {},  # project -> [fragment_ids]
-                "tags": {},      # tag -> [fragment_ids]
                 "stats": {
-                    "total_fragments": 0,
-                    "total_reads": 0,
-                    "total_writes": 0
+                    "total_reads": 0
                 },
-                "created_at": datetime.now(timezone.utc).isoformat()
+                "created_at": _utc_iso()
             }
-        with open(self.pool_path, 'r') as f:
-            return json.load(f)
+        else:
+            with open(self.pool_path, 'rb') as f:
+                state = _loads(f.read())
+
+        for shard in self._shards:
+            shard.load()
+
+        # Pre-sharding pools kept every fragment in the pool file and log
+        legacy_fragments = state.pop("fragments", None)
+        migrate = legacy_fragments is not None
+        for fid, fdata in (legacy_fragments or {}).items():
+            self._shard_for(fid).apply({"op": "put", "id": fid, "frag": fdata})
+
+        for record in _read_log(self.log_path):
+            op = record.get("op")
+            if op in ("put", "update"):
+                self._shard_for(record["id"]).apply(record)
+                migrate = True
+            elif op == "stats":
+                state["stats"]["total_reads"] += record.get("reads", 0)
+                for fid, readers in record.get("accessed", {}).items():
+                    self._shard_for(fid).apply({"op": "access", "accessed": {fid: readers}})
+                    migrate = True
+
+        # Indexes are derived data: rebuild rather than persist them
+        state["projects"] = {}  # project -> {fragment_ids}
+        state["tags"] = {}      # tag -> {fragment_ids}
+        state["types"] = {}     # fragment type -> {fragment_ids}
+        self._state = state
+        for shard in self._shards:
+            for fid, fdata in shard.index_items():
+                self._index_fragment(fid, fdata)
+
+        if migrate:
+            state["version"] = "2.0.0"
+            state["stats"] = {"total_reads": state["stats"]["total_reads"]}
+            for shard in self._shards:
+                shard.compact()
+            self._compact()
+
+        return state
+
+    def _index_fragment(self, fid: str, fdata: Dict[str, Any]) -> None:
+        """Add a fragment to the project, tag and type indexes. Caller holds the write lock."""
+        # Index by project
+        project = fdata.get("project")
+        if project:
+            self._state["projects"].setdefault(project, set()).add(fid)
+
+        # Index by tags
+        for tag in fdata.get("tags", []):
+            self._state["tags"].setdefault(tag, set()).add(fid)
+
+        # Index by type
+        self._state["types"].setdefault(fdata.get("type", "unknown"), set()).add(fid)
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """Buffer one record for the pool log. Caller holds the write lock."""
+        self._pending_log.append(_dumps(record) + b"\n")
+        self._schedule_write()
+
+    def _write_log(self) -> None:
+        """Write buffered pool records to the log in one go. Caller holds the write lock."""
+        if not self._pending_log:
+            return
+        self._log = _open_log(self._log, self.log_path)
+        self._log.write(b"".join(self._pending_log))
+        self._log.flush()
+        self._pending_log.clear()
+
+        if self._log.tell() > COMPACT_MIN_LOG_BYTES:
+            self._compact()
+
+    def _schedule_write(self) -> None:
+        """Wake the writer thread, starting it on first use."""
+        if self._writer_thread is None:
+            with self._notify_lock:
+                if self._writer_thread is None:
+                    self._writer_stop = threading.Event()
+                    self._writer_thread = threading.Thread(
+                        target=self._writer_worker,
+                        args=(self._writer_stop,),
+                        name=f"ctm-writer-{self.pool_id}",
+                        daemon=True
+                    )
+                    self._writer_thread.start()
+        self._dirty_event.set()
+
+    def _writer_worker(self, stop: threading.Event) -> None:
+        """Write buffered records to disk, one batch per burst of mutations, until stop is set."""
+        while not stop.is_set():
+            self._dirty_event.wait()
+            if stop.is_set():
+                break  # close() writes whatever is still buffered
+            time.sleep(FLUSH_INTERVAL_MS / 1000)  # Let the burst coalesce
+            self._dirty_event.clear()
+            try:
+                self._write_pending()
+            except OSError:
+                pass  # Records stay buffered; retried on the next write or close()
+
+    def _write_pending(self) -> None:
+        """Write every shard's and the pool's buffered records to disk."""
+        for shard in self._shards:
+            with shard.rwlock.gen_wlock():
+                shard.write_pending()
+        with self._rwlock.gen_wlock():
+            self._write_log()
 
     def _save_state(self) -> None:
-        with self._lock:
-            self._state["stats"]["total_fragments"] = len(self._state["fragments"])
-            with open(self.pool_path, 'w') as f:
-                json.dump(self._state, f, indent=2)
+        """Write the pool metadata snapshot. Caller holds the write lock."""
+        snapshot = {k: v for k, v in self._state.items() if k not in ("projects", "tags", "types")}
+        with self._stats_lock:
+            _write_json_atomic(self.pool_path, snapshot)
+            self._pending_reads = 0  # Included in the snapshot
+
+    def _compact(self) -> None:
+        """Fold the pool log into a fresh snapshot and drop it. Caller holds the write lock."""
+        self._save_state()
+        self._pending_log.clear()  # Already folded into the snapshot
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        self.log_path.unlink(missing_ok=True)
+
+    def compact(self) -> None:
+        """Fold every shard's log and the pool log into fresh snapshots."""
+        for shard in self._shards:
+            with shard.rwlock.gen_wlock():
+                shard.compact()
+        with self._rwlock.gen_wlock():
+            self._compact()
+
+    def flush(self) -> None:
+        """Persist batched read state and every buffered log record now."""
+        self._stage_reads()
+        self._write_pending()
+
+    def _stage_reads(self) -> None:
+        """Buffer log records for batched read counters and accessed_by deltas."""
+        with self._stats_lock:
+            if not (self._pending_reads or self._pending_access):
+                return
+            reads, self._pending_reads = self._pending_reads, 0
+            pending, self._pending_access = self._pending_access, {}
+
+        # One access record per touched shard
+        by_shard: Dict[int, Dict[str, List[str]]] = {}
+        for fid, readers in pending.items():
+            by_shard.setdefault(id(self._shard_for(fid)), {})[fid] = sorted(readers)
+        for shard in self._shards:
+            accessed = by_shard.get(id(shard))
+            if accessed:
+                with shard.rwlock.gen_wlock():
+                    shard.append({"op": "access", "accessed": accessed})
+
+        if reads:
+            with self._rwlock.gen_wlock():
+                self._append({"op": "stats", "reads": reads})
+
+    def close(self) -> None:
+        """
+        Deliver queued notifications, stop the worker threads, write all
+        buffered state and release the log handles.
 
-    def _generate_id(self, ftype: FragmentType, content: str) -> str:
-        h = hashlib.md5(f"{ftype.value}:{content[:100]}:{datetime.now().isoformat()}".encode()).hexdigest()[:12]
+        The pool stays usable; its threads are restarted on demand.
+        """
+        atexit.unregister(self.close)
+        with _pools_lock:
+            if _pools.get(self.pool_id) is self:
+                del _pools[self.pool_id]
+        current = threading.current_thread()
+        with self._notify_lock:
+            notify_thread, self._notify_thread = self._notify_thread, None
+            writer_thread, self._writer_thread = self._writer_thread, None
+            writer_stop, self._writer_stop = self._writer_stop, None
+        if notify_thread is not None:
+            self._notify_q.put(None)
+            if current is not notify_thread:
+                notify_thread.join()
+        if writer_thread is not None:
+            writer_stop.set()
+            self._dirty_event.set()
+            if current is not writer_thread:
+                writer_thread.join()
+        self.flush()
+        for shard in self._shards:
+            with shard.rwlock.gen_wlock():
+                shard.close()
+        with self._rwlock.gen_wlock():
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def _generate_id(self, ftype: FragmentType, content: str, now_ns: int) -> str:
+        # Fingerprint only - no need for a cryptographic hash
+        key = f"{ftype.value}:{content[:100]}:{now_ns}".encode()
+        if XXHASH_AVAILABLE:
+            h = xxhash.xxh3_64_hexdigest(key)[:12]
+        else:
+            h = hashlib.blake2b(key, digest_size=6).hexdigest()
         return f"{ftype.value[:3]}-{h}"
 
     def publish(self, agent_id: str, ftype: FragmentType, content: str,
@@ -201,8 +824,10 @@ class SharedMemoryPool:
 
         Returns the created fragment.
         """
-        now = datetime.now(timezone.utc).isoformat()
-        fid = self._generate_id(ftype, content)
+        # One clock read salts the id and stamps the provenance
+        now_ns = time.time_ns()
+        now = _utc_iso(now_ns)
+        fid = self._generate_id(ftype, content, now_ns)
 
         provenance = Provenance(
             created_by=agent_id,
@@ -221,25 +846,16 @@ class SharedMemoryPool:
             metadata=metadata or {}
         )
 
-        # Store fragment
-        self._state["fragments"][fid] = fragment.to_dict()
-
-        # Index by project
-        if project:
-            if project not in self._state["projects"]:
-                self._state["projects"][project] = []
-            self._state["projects"][project].append(fid)
-
-        # Index by tags
-        for tag in (tags or []):
-            if tag not in self._state["tags"]:
-                self._state["tags"][tag] = []
-            self._state["tags"][tag].append(fid)
+        # Store fragment in its shard, then index it
+        self._stage_reads()
+        fdata = fragment.to_dict()
+        shard = self._shard_for(fid)
+        with shard.rwlock.gen_wlock():
+            shard.commit({"op": "put", "id": fid, "frag": fdata}, fragment)
+        with self._rwlock.gen_wlock():
+            self._index_fragment(fid, fdata)
 
-        self._state["stats"]["total_writes"] += 1
-        self._save_state()
-
-        # Notify subscribers
+        # Notify subscribers (outside the write lock)
         self._notify_subscribers(fragment)
 
         return fragment
@@ -250,23 +866,26 @@ class SharedMemoryPool:
 
         Checks access control and updates provenance.
         """
-        if fragment_id not in self._state["fragments"]:
-            return None
-
-        fdata = self._state["fragments"][fragment_id]
-        fragment = MemoryFragment.from_dict(fdata)
+        shard = self._shard_for(fragment_id)
+        with shard.rwlock.gen_rlock():
+            fragment = shard.get(fragment_id)
+            if fragment is None:
+                return None
+            fdata = shard.raw(fragment_id)
 
-        # Check access
-        if not self._can_access(fragment, reader_agent):
-            return None
+            # Check access
+            if not self._can_access(fragment, reader_agent):
+                return None
 
-        # Update provenance
-        if reader_agent not in fragment.provenance.accessed_by:
-            fragment.provenance.accessed_by.append(reader_agent)
-            self._state["fragments"][fragment_id] = fragment.to_dict()
+            # Update provenance in memory; persisted in batch by flush()
+            with self._stats_lock:
+                if reader_agent not in fragment.provenance.accessed_by:
+                    fragment.provenance.accessed_by.add(reader_agent)
+                    fdata["provenance"].setdefault("accessed_by", []).append(reader_agent)
+                    self._pending_access.setdefault(fragment_id, set()).add(reader_agent)
 
-        self._state["stats"]["total_reads"] += 1
-        self._save_state()
+                self._state["stats"]["total_reads"] += 1
+                self._pending_reads += 1
 
         return fragment
 
@@ -299,43 +918,24 @@ class SharedMemoryPool:
 
         Returns accessible fragments matching criteria.
         """
-        results = []
-        candidate_ids = set()
-
-        # Filter by project
-        if project and project in self._state["projects"]:
-            candidate_ids.update(self._state["projects"][project])
-        elif project is None:
-            candidate_ids.update(self._state["fragments"].keys())
-
-        # Filter by tags (intersection)
-        if tags:
-            tag_ids = set()
-            for tag in tags:
-                if tag in self._state["tags"]:
-                    if not tag_ids:
-                        tag_ids = set(self._state["tags"][tag])
-                    else:
-                        tag_ids &= set(self._state["tags"][tag])
-            if candidate_ids:
-                candidate_ids &= tag_ids
-            else:
-                candidate_ids = tag_ids
-
-        # Check each candidate
-        for fid in list(candidate_ids)[:limit * 2]:  # Over-fetch for filtering
-            fdata = self._state["fragments"].get(fid)
-            if not fdata:
-                continue
+        with self._rwlock.gen_rlock():
+            index = self._state
 
-            fragment = MemoryFragment.from_dict(fdata)
-
-            # Filter by type
-            if ftypes and fragment.type not in ftypes:
-                continue
+            # Narrow by project, then tags (intersection), then types (union)
+            if project is not None:
+                candidate_ids = set(index["projects"].get(project, ()))
+            else:
+                candidate_ids = set().union(*index["types"].values())
+            for tag in tags or ():
+                candidate_ids &= index["tags"].get(tag, set())
+            if ftypes:
+                candidate_ids &= set().union(*(index["types"].get(t.value, set()) for t in ftypes))
 
-            # Check access
-            if not self._can_access(fragment, agent_id):
+        # Only surviving, accessible ids are decoded; stop once the limit is reached
+        results = []
+        for fid in candidate_ids:
+            fragment = self._get_visible(fid, agent_id)
+            if fragment is None:
                 continue
 
             results.append(fragment)
@@ -362,37 +962,69 @@ class SharedMemoryPool:
             filter_project=filter_project,
             callback=callback
         )
-        self._subscriptions.append(sub)
-        return f"sub-{agent_id}-{len(self._subscriptions)}"
+        # Coroutine callbacks run on the subscriber's event loop, if it has one
+        try:
+            sub._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        with self._rwlock.gen_wlock():
+            self._subscriptions.append(sub)
+            return f"sub-{agent_id}-{len(self._subscriptions)}"
 
     def unsubscribe(self, agent_id: str) -> None:
         """Remove all subscriptions for an agent."""
-        self._subscriptions = [s for s in self._subscriptions if s.agent_id != agent_id]
+        with self._rwlock.gen_wlock():
+            self._subscriptions = [s for s in self._subscriptions if s.agent_id != agent_id]
 
     def _notify_subscribers(self, fragment: MemoryFragment) -> None:
-        """Notify relevant subscribers of new fragment."""
-        for sub in self._subscriptions:
-            # Skip if owner (don't notify self)
-            if sub.agent_id == fragment.provenance.created_by:
-                continue
-
-            # Check type filter
-            if sub.filter_types and fragment.type not in sub.filter_types:
-                continue
-
-            # Check tag filter
-            if sub.filter_tags:
-                if not any(t in fragment.tags for t in sub.filter_tags):
-                    continue
-
-            # Check project filter
-            if sub.filter_project and fragment.project != sub.filter_project:
+        """Queue a fragment for delivery so publishers never wait on callbacks."""
+        if not self._subscriptions:
+            return
+
+        with self._notify_lock:
+            if self._notify_thread is None:
+                self._notify_thread = threading.Thread(
+                    target=self._notify_worker,
+                    name=f"ctm-notify-{self.pool_id}",
+                    daemon=True
+                )
+                self._notify_thread.start()
+
+        self._notify_q.put(fragment)
+
+    def _notify_worker(self) -> None:
+        """Deliver queued fragments to subscribers, in publish order."""
+        while True:
+            fragment = self._notify_q.get()
+            if fragment is None:
+                self._notify_q.task_done()
+                return
+            try:
+                self._deliver(fragment)
+            finally:
+                self._notify_q.task_done()
+
+    def _deliver(self, fragment: MemoryFragment) -> None:
+        """Invoke the callbacks of subscribers whose filters match."""
+        with self._rwlock.gen_rlock():
+            subscriptions = list(self._subscriptions)
+
+        owner = fragment.provenance.created_by
+        for sub in subscriptions:
+            # Skip if owner (don't notify self) or filtered out
+            if sub.agent_id == owner or not sub._match(fragment):
                 continue
 
             # Invoke callback if provided
             if sub.callback:
                 try:
-                    sub.callback(fragment)
+                    if asyncio.iscoroutinefunction(sub.callback):
+                        if sub._loop is not None and sub._loop.is_running():
+                            asyncio.run_coroutine_threadsafe(sub.callback(fragment), sub._loop)
+                        else:
+                            asyncio.run(sub.callback(fragment))
+                    else:
+                        sub.callback(fragment)
                 except Exception:
                     pass
 
@@ -402,40 +1034,44 @@ class SharedMemoryPool:
         """
         Update an existing fragment.
 
-        Increments version and updates provenance.
+        Increments version and updates provenance. Returns the new version;
+        fragment objects handed out earlier are left unchanged.
         """
-        if fragment_id not in self._state["fragments"]:
-            return None
-
-        fdata = self._state["fragments"][fragment_id]
-        fragment = MemoryFragment.from_dict(fdata)
-
-        # Check access (must be owner or have write access)
-        if fragment.access == AccessLevel.PRIVATE:
-            if fragment.provenance.created_by != updater_agent:
+        self._stage_reads()
+        shard = self._shard_for(fragment_id)
+        with shard.rwlock.gen_wlock():
+            fragment = shard.get(fragment_id)
+            if fragment is None:
                 return None
 
-        # Update content
-        if content is not None:
-            fragment.content = content
-
-        # Update metadata
-        if metadata:
-            fragment.metadata.update(metadata)
-
-        # Update provenance
-        now = datetime.now(timezone.utc).isoformat()
-        fragment.provenance.modified_by.append(updater_agent)
-        fragment.provenance.modified_at.append(now)
-
-        # Increment version
-        fragment.version += 1
-
-        # Save
-        self._state["fragments"][fragment_id] = fragment.to_dict()
-        self._save_state()
-
-        # Notify
+            # Check access (must be owner or have write access)
+            if fragment.access == AccessLevel.PRIVATE:
+                if fragment.provenance.created_by != updater_agent:
+                    return None
+
+            # Build the new version; the old object may still be held by
+            # readers and queued notifications, so it is never mutated
+            now = _utc_iso()
+            old = fragment.provenance
+            provenance = replace(
+                old,
+                modified_by=old.modified_by + [updater_agent],
+                modified_at=old.modified_at + [now],
+                accessed_by=set(old.accessed_by),
+                source_files=list(old.source_files)
+            )
+            fragment = replace(
+                fragment,
+                content=fragment.content if content is None else content,
+                metadata={**fragment.metadata, **metadata} if metadata else dict(fragment.metadata),
+                provenance=provenance,
+                version=fragment.version + 1
+            )
+
+            # Save (and swap into the shard's cache)
+            shard.commit({"op": "update", "id": fragment_id, "frag": fragment.to_dict()}, fragment)
+
+        # Notify (outside the write lock)
         self._notify_subscribers(fragment)
 
         return fragment
@@ -446,15 +1082,40 @@ class SharedMemoryPool:
 
         Returns summary of decisions, learnings, blockers.
         """
-        fragments = self.query(agent_id, project=project, limit=100)
+        with self._rwlock.gen_rlock():
+            project_ids = set(self._state["projects"].get(project, ()))
+            typed_ids = {
+                ftype: project_ids & self._state["types"].get(ftype.value, set())
+                for ftype in (FragmentType.DECISION, FragmentType.LEARNING, FragmentType.BLOCKER)
+            }
 
-        decisions = [f for f in fragments if f.type == FragmentType.DECISION]
-        learnings = [f for f in fragments if f.type == FragmentType.LEARNING]
-        blockers = [f for f in fragments if f.type == FragmentType.BLOCKER]
+        # Counted from the raw dicts, so only accessible fragments count and
+        # nothing is decoded just to be counted
+        total_fragments = sum(1 for fid in project_ids if self._get_visible_raw(fid, agent_id))
+
+        def newest(ftype: FragmentType) -> List[MemoryFragment]:
+            # The 100 most recent, oldest first; only those are decoded
+            stamped = []
+            for fid in typed_ids[ftype]:
+                fdata = self._get_visible_raw(fid, agent_id)
+                if fdata:
+                    stamped.append((fdata["provenance"]["created_at"], fid))
+            stamped.sort()
+            result = []
+            for _, fid in stamped[-100:]:
+                fragment = self._get_visible(fid, agent_id)
+                if fragment:
+                    result.append(fragment)
+            return result
+
+        decisions = newest(FragmentType.DECISION)
+        learnings = newest(FragmentType.LEARNING)
+        blockers = newest(FragmentType.BLOCKER)
+        fragments = decisions + learnings + blockers
 
         return {
             "project": project,
-            "total_fragments": len(fragments),
+            "total_fragments": total_fragments,
             "decisions": [{"id": d.id, "content": d.content[:100], "by": d.provenance.created_by} for d in decisions],
             "learnings": [{"id": l.id, "content": l.content[:100], "by": l.provenance.created_by} for l in learnings],
             "active_blockers": [{"id": b.id, "content": b.content, "by": b.provenance.created_by} for b in blockers],
@@ -463,33 +1124,43 @@ class SharedMemoryPool:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get pool statistics."""
-        type_counts = {}
-        for fdata in self._state["fragments"].values():
-            ftype = fdata.get("type", "unknown")
-            type_counts[ftype] = type_counts.get(ftype, 0) + 1
+        total_writes = 0
+        for shard in self._shards:
+            with shard.rwlock.gen_rlock():
+                total_writes += shard.writes
 
-        return {
-            "pool_id": self.pool_id,
-            "total_fragments": self._state["stats"]["total_fragments"],
-            "total_reads": self._state["stats"]["total_reads"],
-            "total_writes": self._state["stats"]["total_writes"],
-            "by_type": type_counts,
-            "projects": list(self._state["projects"].keys()),
-            "tags": list(self._state["tags"].keys()),
-            "active_subscriptions": len(self._subscriptions)
-        }
+        with self._rwlock.gen_rlock():
+            total_fragments = sum(len(ids) for ids in self._state["types"].values())
+            return {
+                "pool_id": self.pool_id,
+                "total_fragments": total_fragments,
+                "total_reads": self._state["stats"]["total_reads"],
+                "total_writes": total_writes,
+                "by_type": {ftype: len(ids) for ftype, ids in self._state["types"].items()},
+                "projects": list(self._state["projects"].keys()),
+                "tags": list(self._state["tags"].keys()),
+                "active_subscriptions": len(self._subscriptions)
+            }
+
+
+_pools: Dict[str, SharedMemoryPool] = {}  # pool_id -> open pool, one per process
+_pools_lock = Lock()
 
 
 def get_shared_pool(pool_id: str = "default") -> SharedMemoryPool:
     """Get or create a shared memory pool."""
-    return SharedMemoryPool(pool_id)
+    with _pools_lock:
+        pool = _pools.get(pool_id)
+        if pool is None:
+            pool = _pools[pool_id] = SharedMemoryPool(pool_id)
+        return pool
 
 
 def get_project_pool(project_path: str) -> SharedMemoryPool:
     """Get shared pool for a project."""
-    # Use project path hash as pool ID
+    # Use project path hash as pool ID (kept as md5 so existing pools stay addressable)
     pool_id = hashlib.md5(project_path.encode()).hexdigest()[:8]
-    return SharedMemoryPool(f"project-{pool_id}")
+    return get_shared_pool(f"project-{pool_id}")
 
 
 # Convenience functions for agents
@@ -9,6 +9,7 @@ Provides consistent styling for CLI output with:
 """
 
 import sys
+from itertools import zip_longest
 from typing import Optional
 
 
@@ -55,47 +56,65 @@ class Colors:
 # Check once at import time
 _USE_COLOR = supports_color()
 
+# Style prefixes, resolved once so the helpers below skip join and the color check
+_RESET = Colors.RESET if _USE_COLOR else ""
+_BOLD = Colors.BOLD if _USE_COLOR else ""
+_DIM = Colors.DIM if _USE_COLOR else ""
+_GREEN = Colors.GREEN if _USE_COLOR else ""
+_RED = Colors.RED if _USE_COLOR else ""
+_YELLOW = Colors.YELLOW if _USE_COLOR else ""
+_CYAN = Colors.CYAN if _USE_COLOR else ""
+_BRIGHT_BLACK = Colors.BRIGHT_BLACK if _USE_COLOR else ""
+
 
 def color(text: str, *codes: str) -> str:
-    """Apply color codes to text if terminal supports it."""
-    if not _USE_COLOR:
-        return text
+    """Apply color codes to text if terminal supports it (see _plain below)."""
     return f"{''.join(codes)}{text}{Colors.RESET}"
 
 
 def bold(text: str) -> str:
     """Make text bold."""
-    return color(text, Colors.BOLD)
+    return f"{_BOLD}{text}{_RESET}"
 
 
 def dim(text: str) -> str:
     """Make text dim."""
-    return color(text, Colors.DIM)
+    return f"{_DIM}{text}{_RESET}"
 
 
 def success(text: str) -> str:
     """Style as success (green)."""
-    return color(text, Colors.GREEN)
+    return f"{_GREEN}{text}{_RESET}"
 
 
 def error(text: str) -> str:
     """Style as error (red)."""
-    return color(text, Colors.RED)
+    return f"{_RED}{text}{_RESET}"
 
 
 def warning(text: str) -> str:
     """Style as warning (yellow)."""
-    return color(text, Colors.YELLOW)
+    return f"{_YELLOW}{text}{_RESET}"
 
 
 def info(text: str) -> str:
     """Style as info (cyan)."""
-    return color(text, Colors.CYAN)
+    return f"{_CYAN}{text}{_RESET}"
 
 
 def muted(text: str) -> str:
     """Style as muted (dim)."""
-    return color(text, Colors.BRIGHT_BLACK)
+    return f"{_BRIGHT_BLACK}{text}{_RESET}"
+
+
+def _plain(text: str, *codes: str) -> str:
+    """Return text unstyled."""
+    return text
+
+
+# Without color support every helper is the identity: no wrapping, no extra frame
+if not _USE_COLOR:
+    color = bold = dim = success = error = warning = info = muted = _plain
 
 
 # Status icons with colors
@@ -115,16 +134,19 @@ class Icons:
     BULLET = "•"
 
 
+# Colored once at import; status_icon is called from every render loop
+_STATUS_ICONS = {
+    "active": color(Icons.ACTIVE, Colors.GREEN),
+    "paused": color(Icons.PAUSED, Colors.YELLOW),
+    "blocked": color(Icons.BLOCKED, Colors.RED),
+    "completed": color(Icons.COMPLETED, Colors.BRIGHT_BLACK),
+    "cancelled": color(Icons.CANCELLED, Colors.BRIGHT_BLACK),
+}
+
+
 def status_icon(status: str) -> str:
     """Get colored icon for agent status."""
-    icons = {
-        "active": color(Icons.ACTIVE, Colors.GREEN),
-        "paused": color(Icons.PAUSED, Colors.YELLOW),
-        "blocked": color(Icons.BLOCKED, Colors.RED),
-        "completed": color(Icons.COMPLETED, Colors.BRIGHT_BLACK),
-        "cancelled": color(Icons.CANCELLED, Colors.BRIGHT_BLACK),
-    }
-    return icons.get(status, Icons.PENDING)
+    return _STATUS_ICONS.get(status, Icons.PENDING)
 
 
 def priority_color(score: float) -> str:
@@ -171,21 +193,27 @@ def box(content: str, title: Optional[str] = None) -> str:
 
 
 # Progress bar
+# Every fill level for the common widths, built once for redraw loops
+_BAR_CACHE = {w: ["█" * i + "░" * (w - i) for i in range(w + 1)] for w in (10, 20, 40)}
+
+
 def progress_bar(pct: int, width: int = 20) -> str:
     """Create a progress bar."""
     filled = int(width * pct / 100)
-    empty = width - filled
-
-    bar = "█" * filled + "░" * empty
+    bars = _BAR_CACHE.get(width)
+    if bars is not None and 0 <= filled <= width:
+        bar = bars[filled]
+    else:
+        bar = "█" * filled + "░" * (width - filled)
 
     if pct >= 80:
-        bar = color(bar, Colors.GREEN)
+        prefix = _GREEN
     elif pct >= 50:
-        bar = color(bar, Colors.YELLOW)
+        prefix = _YELLOW
     else:
-        bar = color(bar, Colors.BRIGHT_BLACK)
+        prefix = _BRIGHT_BLACK
 
-    return f"[{bar}] {pct}%"
+    return f"[{prefix}{bar}{_RESET}] {pct}%"
 
 
 # Table formatting
@@ -194,29 +222,21 @@ def table(rows: list, headers: Optional[list] = None) -> str:
     if not rows:
         return ""
 
-    # Calculate column widths
-    all_rows = [headers] + rows if headers else rows
-    num_cols = len(all_rows[0])
-    widths = [0] * num_cols
-
-    for row in all_rows:
-        for i, cell in enumerate(row):
-            widths[i] = max(widths[i], len(str(cell)))
+    # Stringify each cell once, then size columns in a single pass
+    # (zip_longest so short rows don't drop the columns of longer ones)
+    str_rows = [[str(cell) for cell in row] for row in rows]
+    str_headers = [str(h) for h in headers] if headers else None
+    all_rows = [str_headers] + str_rows if str_headers else str_rows
+    widths = [max(map(len, col)) for col in zip_longest(*all_rows, fillvalue="")]
 
     # Build table
     lines = []
 
-    if headers:
-        header_line = "  ".join(
-            bold(str(h).ljust(widths[i])) for i, h in enumerate(headers)
-        )
-        lines.append(header_line)
-        lines.append("─" * (sum(widths) + 2 * (num_cols - 1)))
-
-    for row in rows:
-        line = "  ".join(
-            str(cell).ljust(widths[i]) for i, cell in enumerate(row)
-        )
-        lines.append(line)
+    if str_headers:
+        lines.append("  ".join(bold(h.ljust(w)) for h, w in zip(str_headers, widths)))
+        lines.append("─" * (sum(widths) + 2 * (len(widths) - 1)))
+
+    for row in str_rows:
+        lines.append("  ".join(cell.ljust(w) for cell, w in zip(row, widths)))
 
     return "\n".join(lines)
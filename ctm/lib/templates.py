@@ -5,8 +5,8 @@ Provides YAML-based task templates for spawning pre-configured tasks
 with phases, dependencies, and default settings.
 """
 
+import copy
 import os
-import yaml
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -17,8 +17,27 @@ from config import get_ctm_dir
 
 TEMPLATES_DIR = "templates"
 
+# PyYAML is imported on first load/save, so importing this module stays cheap
+_yaml = None
+_YamlLoader = None
+_YamlDumper = None
 
-@dataclass
+# Parsed templates keyed by path, reused while the file's mtime is unchanged
+_TEMPLATE_CACHE: Dict[Path, tuple] = {}  # path -> (st_mtime_ns, Template)
+
+
+def _get_yaml():
+    """Import PyYAML and pick the libyaml-backed C loader/dumper when it was built with it."""
+    global _yaml, _YamlLoader, _YamlDumper
+    if _yaml is None:
+        import yaml
+        _YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        _YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+        _yaml = yaml
+    return _yaml
+
+
+@dataclass(slots=True)
 class TemplatePhase:
     """A phase within a template."""
     id: str
@@ -27,8 +46,18 @@ class TemplatePhase:
     progress_weight: int = 20
     blocked_by: List[str] = field(default_factory=list)
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert phase to dictionary (built by hand; dataclasses.asdict deep-copies)."""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "steps": self.steps,
+            "progress_weight": self.progress_weight,
+            "blocked_by": self.blocked_by
+        }
+
 
-@dataclass
+@dataclass(slots=True)
 class TemplateDefaults:
     """Default values for tasks spawned from template."""
     priority_value: float = 0.5
@@ -36,7 +65,7 @@ class TemplateDefaults:
     key_files: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class Template:
     """A task template definition."""
     name: str
@@ -86,16 +115,7 @@ class Template:
                 },
                 "key_files": self.defaults.key_files
             },
-            "phases": [
-                {
-                    "id": p.id,
-                    "title": p.title,
-                    "steps": p.steps,
-                    "progress_weight": p.progress_weight,
-                    "blocked_by": p.blocked_by
-                }
-                for p in self.phases
-            ],
+            "phases": [p.to_dict() for p in self.phases],
             "tags": self.tags
         }
 
@@ -110,15 +130,15 @@ def get_templates_dir() -> Path:
 
 def list_templates() -> List[str]:
     """List available template names."""
-    templates_dir = get_templates_dir()
-    templates = []
+    templates = set()  # A name may exist as both .yaml and .yml
 
-    for path in templates_dir.glob("*.yaml"):
-        templates.append(path.stem)
-    for path in templates_dir.glob("*.yml"):
-        templates.append(path.stem)
+    # One directory sweep covers both extensions
+    with os.scandir(get_templates_dir()) as entries:
+        for entry in entries:
+            if entry.name.endswith((".yaml", ".yml")) and entry.is_file():
+                templates.add(entry.name.rsplit(".", 1)[0])
 
-    return sorted(set(templates))
+    return sorted(templates)
 
 
 def load_template(name: str) -> Optional[Template]:
@@ -128,13 +148,23 @@ def load_template(name: str) -> Optional[Template]:
     # Try .yaml first, then .yml
     for ext in [".yaml", ".yml"]:
         path = templates_dir / f"{name}{ext}"
-        if path.exists():
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
+            continue
+
+        cached = _TEMPLATE_CACHE.get(path)
+        if cached is None or cached[0] != mtime_ns:
             try:
-                with open(path) as f:
-                    data = yaml.safe_load(f)
-                    return Template.from_dict(data)
+                with open(path, encoding='utf-8') as f:
+                    data = _get_yaml().load(f, Loader=_YamlLoader)
+                    cached = (mtime_ns, Template.from_dict(data))
             except Exception:
                 return None
+            _TEMPLATE_CACHE[path] = cached
+
+        # Callers may mutate the template (or alias its lists), so hand out a copy
+        return copy.deepcopy(cached[1])
 
     return None
 
@@ -144,9 +174,12 @@ def save_template(template: Template, name: Optional[str] = None) -> Path:
     templates_dir = get_templates_dir()
     filename = name or template.name.lower().replace(" ", "-")
     path = templates_dir / f"{filename}.yaml"
+    _TEMPLATE_CACHE.pop(path, None)
 
-    with open(path, 'w') as f:
-        yaml.dump(template.to_dict(), f, default_flow_style=False, sort_keys=False)
+    # allow_unicode writes non-ASCII scalars verbatim instead of escaping them
+    with open(path, 'w', encoding='utf-8') as f:
+        _get_yaml().dump(template.to_dict(), f, Dumper=_YamlDumper, default_flow_style=False,
+                  sort_keys=False, allow_unicode=True)
 
     return path
 
@@ -258,15 +291,7 @@ def apply_template_to_agent(agent: "Agent", template: Template) -> None:
 
     # Store phase structure
     agent.context["phases"] = [
-        {
-            "id": p.id,
-            "title": p.title,
-            "steps": p.steps,
-            "progress_weight": p.progress_weight,
-            "blocked_by": p.blocked_by,
-            "status": "pending",
-            "completed_steps": []
-        }
+        {**p.to_dict(), "status": "pending", "completed_steps": []}
         for p in template.phases
     ]
 
@@ -14,15 +14,30 @@ context when the user's attention shifts.
 
 import re
 import hashlib
+import sqlite3
+import time
+from array import array
 from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass
 
-from config import load_config
-from agents import Agent, get_agent, AgentIndex, list_agents
+from config import load_config, get_ctm_dir
+from agents import get_agent, AgentIndex, list_agents
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 # Lazy import for embeddings
 _embeddings = None
-_embedding_cache = {}
+_embedding_cache = {}  # Input text key -> embedding, for repeated utterances
 
 def get_embeddings():
     global _embeddings
@@ -34,6 +49,61 @@ def get_embeddings():
             _embeddings = None
     return _embeddings
 
+EMBEDDINGS_DB = "embeddings.sqlite"
+AGENT_CACHE_TTL = 2.0  # Seconds a detector reuses its agent list
+INPUT_EMBEDDING_CACHE_SIZE = 256
+INACTIVE_STATUSES = frozenset({"completed", "cancelled"})  # Never matched by triggers
+_embedding_db = None
+
+
+def _get_embedding_db() -> Optional[sqlite3.Connection]:
+    """Open the on-disk embedding cache (text hash -> packed float64 vector)."""
+    global _embedding_db
+    if _embedding_db is None:
+        try:
+            path = get_ctm_dir() / EMBEDDINGS_DB
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _embedding_db = sqlite3.connect(str(path))
+            _embedding_db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+        except sqlite3.Error:
+            return None
+    return _embedding_db
+
+
+def _embedding_key(model: str, text: str) -> str:
+    """Key an embedding by model and text, so a model change never reuses vectors."""
+    return hashlib.blake2b(f"{model}\0{text}".encode(), digest_size=16).hexdigest()
+
+
+def _load_embedding(key: str) -> Optional[List[float]]:
+    """Look up a persisted embedding."""
+    db = _get_embedding_db()
+    if db is None:
+        return None
+    try:
+        row = db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error:
+        return None
+    return array("d", row[0]).tolist() if row else None
+
+
+def _store_embedding(key: str, embedding: List[float]) -> None:
+    """Persist an embedding for later processes."""
+    db = _get_embedding_db()
+    if db is None:
+        return
+    try:
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                (key, array("d", embedding).tobytes())
+            )
+    except sqlite3.Error:
+        pass
+
+
 def cosine_sim(a: List[float], b: List[float]) -> float:
     if not a or not b or len(a) != len(b):
         return 0.0
@@ -43,7 +113,17 @@ def cosine_sim(a: List[float], b: List[float]) -> float:
     return dot / (na * nb) if na and nb else 0.0
 
 
-@dataclass
+def _alternation(patterns: Tuple[str, ...]) -> "re.Pattern":
+    """Compile patterns into a single case-insensitive alternation, used as an any-match gate."""
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
+
+def _compile_each(patterns: Tuple[str, ...]) -> Tuple["re.Pattern", ...]:
+    """Compile each pattern on its own, case-insensitively."""
+    return tuple(re.compile(p, re.IGNORECASE) for p in patterns)
+
+
+@dataclass(slots=True)
 class TriggerMatch:
     """Represents a detected trigger."""
     type: str  # switch, resume, complete, escalate, mention
@@ -57,47 +137,164 @@ class TriggerMatch:
 class TriggerDetector:
     """
     Detects triggers in user input that should cause context switches.
+
+    Trigger patterns are compiled once, at class creation, each on its own
+    and as one alternation per category that gates the per-pattern scans.
     """
 
     # Patterns that suggest switching to a task
-    SWITCH_PATTERNS = [
+    SWITCH_PATTERNS = (
         r"(?:back to|return to|continue|resume|pick up)\s+['\"]?(.+?)['\"]?(?:\s|$|\.|\?)",
         r"(?:what about|how about|let's work on|switch to)\s+['\"]?(.+?)['\"]?(?:\s|$|\.|\?)",
         r"(?:can we|let's)\s+(?:get back to|continue)\s+['\"]?(.+?)['\"]?(?:\s|$|\.|\?)",
-    ]
+    )
 
     # Patterns that suggest completing current task
-    COMPLETE_PATTERNS = [
+    COMPLETE_PATTERNS = (
         r"(?:done|finished|completed?|that's it|all done)\s*(?:with)?\s*(?:this|that|the task)?",
         r"(?:mark|set)\s+(?:as|it)?\s*(?:complete|done|finished)",
         r"task\s+(?:is\s+)?(?:complete|done|finished)",
-    ]
+    )
 
     # Patterns that suggest priority escalation
-    ESCALATE_PATTERNS = [
+    ESCALATE_PATTERNS = (
         r"\b(?:urgent|urgently|asap|critical|emergency|immediately|right now)\b",
         r"\b(?:drop everything|highest priority|most important)\b",
         r"\b(?:this is urgent|need this now|priority one|p0|p1)\b",
-    ]
+    )
 
     # Patterns for pausing
-    PAUSE_PATTERNS = [
+    PAUSE_PATTERNS = (
         r"(?:pause|stop|hold|park)\s+(?:this|that|the task|current)",
         r"(?:put|set)\s+(?:this|that)?\s*(?:aside|on hold)",
         r"(?:let's take a break|pause here)",
-    ]
+    )
+
+    # One alternation per category: a single scan rules the category out.
+    # Matches of different patterns can overlap and the alternation would
+    # report only one, so on a hit each pattern is still run on its own.
+    SWITCH_RE = _alternation(SWITCH_PATTERNS)
+    COMPLETE_RE = _alternation(COMPLETE_PATTERNS)
+    ESCALATE_RE = _alternation(ESCALATE_PATTERNS)
+    PAUSE_RE = _alternation(PAUSE_PATTERNS)
+    SWITCH_EACH = _compile_each(SWITCH_PATTERNS)
+    COMPLETE_EACH = _compile_each(COMPLETE_PATTERNS)
+    ESCALATE_EACH = _compile_each(ESCALATE_PATTERNS)
+    PAUSE_EACH = _compile_each(PAUSE_PATTERNS)
+
+    # Literal substrings at least one of which every match of the category
+    # contains; most inputs contain none, so the regex scan is skipped
+    SWITCH_NEEDLES = ("back to", "return to", "continue", "resume", "pick up",
+                      "about", "let's work on", "switch to")
+    COMPLETE_NEEDLES = ("done", "finished", "complete", "that's it")
+    ESCALATE_NEEDLES = ("urgent", "asap", "critical", "emergency", "immediately", "right now",
+                        "drop everything", "highest priority", "most important",
+                        "need this now", "priority one", "p0", "p1")
+    PAUSE_NEEDLES = ("pause", "stop", "hold", "park", "aside", "take a break")
 
     def __init__(self):
         self.config = load_config()
         self.index = AgentIndex()
         self._agent_cache = None
+        self._agent_cache_time = 0.0
+        self._profiles: List[Dict[str, Any]] = []  # Lowercased forms, parallel to _agent_cache
+        self._shortest_key = 0  # Length of the shortest mentionable ID or title
+        self._automaton = None  # Mention matcher over _agent_cache
 
     def _get_agents(self) -> List[Dict[str, Any]]:
-        """Get cached list of active agents."""
-        if self._agent_cache is None:
-            self._agent_cache = list_agents()
+        """Get cached list of active agents, reloaded after AGENT_CACHE_TTL seconds."""
+        now = time.monotonic()
+        if self._agent_cache is None or now - self._agent_cache_time > AGENT_CACHE_TTL:
+            self._agent_cache = [a for a in list_agents() if a.get("status") not in INACTIVE_STATUSES]
+            self._agent_cache_time = now
+            self._profiles = [self._build_profile(agent) for agent in self._agent_cache]
+            self._shortest_key = min((len(key) for _, _, key in self._mention_keys()), default=0)
+            self._automaton = None
         return self._agent_cache
 
+    @staticmethod
+    def _build_profile(agent: Dict[str, Any]) -> Dict[str, Any]:
+        """Precompute the lowercased ID, title and title words matched against on every call."""
+        title_lower = agent["title"].lower()
+        title_split = title_lower.split()
+        return {
+            "id_lower": agent["id"].lower(),
+            "title_lower": title_lower,
+            "title_words": frozenset(title_split),
+            "title_word_count": len(title_split),
+        }
+
+    def _get_profiles(self) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Get (agent, profile) pairs for the cached agent list."""
+        agents = self._get_agents()
+        return list(zip(agents, self._profiles))
+
+    def _agent_triggers(self, agent: Dict[str, Any]) -> List[str]:
+        """
+        Get an agent's custom triggers from its index entry.
+
+        Index entries written before triggers were indexed fall back to
+        loading the agent once per agent-list refresh.
+        """
+        triggers = agent.get("triggers")
+        if triggers is None:
+            full_agent = get_agent(agent["id"])
+            triggers = agent["triggers"] = (full_agent.triggers or []) if full_agent else []
+        return triggers
+
+    def invalidate_agent_cache(self) -> None:
+        """Force the next call to reload the agent list."""
+        self._agent_cache = None
+
+    def _mention_keys(self):
+        """Yield (agent position, kind, lowercased key) for every mentionable ID and title."""
+        for pos, (agent, profile) in enumerate(self._get_profiles()):
+            yield pos, "id", profile["id_lower"]
+
+            # Titles need at least 2 words to avoid false positives
+            if profile["title_word_count"] >= 2:
+                yield pos, "title", profile["title_lower"]
+
+    def _get_automaton(self) -> "ahocorasick.Automaton":
+        """Build the Aho-Corasick automaton over agent IDs and titles once per agent list."""
+        self._get_agents()  # Loading the agent list drops a stale automaton
+        if self._automaton is None:
+            automaton = ahocorasick.Automaton()
+            for pos, kind, key in self._mention_keys():
+                hits = automaton.get(key, None)
+                if hits is None:
+                    hits = []
+                    automaton.add_word(key, hits)
+                hits.append((pos, kind))
+            automaton.make_automaton()
+            self._automaton = automaton
+        return self._automaton
+
+    def _find_mentions(self, input_lower: str) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        Find agents whose ID or title appears in the input.
+
+        Returns (agent, kind) pairs in agent order, ID before title. With
+        pyahocorasick this is one pass over the input for all agents.
+        """
+        agents = self._get_agents()
+        if not agents or len(input_lower) < self._shortest_key:
+            return []  # Too short to contain any ID or title
+
+        if AHOCORASICK_AVAILABLE:
+            found = set()
+            for _end, hits in self._get_automaton().iter(input_lower):
+                found.update(hits)
+            return [(agents[pos], kind) for pos, kind in sorted(found)]
+
+        # A key longer than the input cannot occur in it; skip the scan
+        len_input = len(input_lower)
+        return [
+            (agents[pos], kind)
+            for pos, kind, key in self._mention_keys()
+            if len(key) <= len_input and key in input_lower
+        ]
+
     def _fuzzy_match_agent(self, text: str) -> Optional[Tuple[str, str, float]]:
         """
         Try to match text to an agent by ID or title.
@@ -105,22 +302,35 @@ class TriggerDetector:
         Returns (agent_id, title, confidence) or None.
         """
         text_lower = text.lower().strip()
+        text_words = frozenset(text_lower.split())
 
-        # Direct ID match
-        for agent in self._get_agents():
-            if agent["id"].lower().startswith(text_lower):
-                return (agent["id"], agent["title"], 1.0)
-
-        # Title match (fuzzy)
+        # One pass; precedence is ID prefix > exact title > custom trigger > best fuzzy score
+        title_match = None
+        trigger_match = None
         best_match = None
         best_score = 0.0
 
-        for agent in self._get_agents():
-            title_lower = agent["title"].lower()
+        for agent, profile in self._get_profiles():
+            # Direct ID match (nothing outranks it)
+            if profile["id_lower"].startswith(text_lower):
+                return (agent["id"], agent["title"], 1.0)
+
+            if title_match is not None:
+                continue  # Only an ID match can still win
+            title_lower = profile["title_lower"]
 
             # Exact title match
             if text_lower == title_lower:
-                return (agent["id"], agent["title"], 1.0)
+                title_match = (agent["id"], agent["title"], 1.0)
+                continue
+
+            # Check custom triggers on agents
+            if trigger_match is None:
+                for trigger in self._agent_triggers(agent):
+                    trigger_lower = trigger.lower()
+                    if text_lower in trigger_lower or trigger_lower in text_lower:
+                        trigger_match = (agent["id"], agent["title"], 0.95)
+                        break
 
             # Partial title match
             if text_lower in title_lower or title_lower in text_lower:
@@ -130,8 +340,7 @@ class TriggerDetector:
                     best_match = (agent["id"], agent["title"], min(0.9, score))
 
             # Word overlap
-            text_words = set(text_lower.split())
-            title_words = set(title_lower.split())
+            title_words = profile["title_words"]
             overlap = len(text_words & title_words)
             if overlap > 0:
                 score = overlap / max(len(text_words), len(title_words))
@@ -139,16 +348,24 @@ class TriggerDetector:
                     best_score = score
                     best_match = (agent["id"], agent["title"], score)
 
-        # Check custom triggers on agents
-        for agent in self._get_agents():
-            full_agent = get_agent(agent["id"])
-            if full_agent and full_agent.triggers:
-                for trigger in full_agent.triggers:
-                    if text_lower in trigger.lower() or trigger.lower() in text_lower:
-                        return (agent["id"], agent["title"], 0.95)
-
+        if title_match is not None:
+            return title_match
+        if trigger_match is not None:
+            return trigger_match
         return best_match if best_score > 0.3 else None
 
+    @staticmethod
+    def _first_match(gate: "re.Pattern", patterns: Tuple["re.Pattern", ...],
+                     text: str) -> Optional["re.Match"]:
+        """Search with the first pattern (in order) that matches, if the gate matches at all."""
+        if not gate.search(text):
+            return None
+        for pattern in patterns:
+            match = pattern.search(text)
+            if match:
+                return match
+        return None
+
     def detect(self, user_input: str) -> List[TriggerMatch]:
         """
         Detect triggers in user input.
@@ -159,62 +376,68 @@ class TriggerDetector:
         input_lower = user_input.lower()
 
         # Check switch patterns
-        for pattern in self.SWITCH_PATTERNS:
-            for match in re.finditer(pattern, input_lower, re.IGNORECASE):
-                task_ref = match.group(1).strip()
-                agent_match = self._fuzzy_match_agent(task_ref)
-
-                if agent_match:
-                    agent_id, title, conf = agent_match
-                    matches.append(TriggerMatch(
-                        type="switch",
-                        agent_id=agent_id,
-                        agent_title=title,
-                        confidence=conf * 0.9,  # Reduce slightly for pattern match
-                        matched_text=match.group(0),
-                        action_suggested=f"Switch to [{agent_id}]: {title}"
-                    ))
-
-        # Check complete patterns
-        for pattern in self.COMPLETE_PATTERNS:
-            if re.search(pattern, input_lower, re.IGNORECASE):
+        switch_matches = (
+            [match for pattern in self.SWITCH_EACH for match in pattern.finditer(input_lower)]
+            if any(n in input_lower for n in self.SWITCH_NEEDLES) and self.SWITCH_RE.search(input_lower)
+            else ()
+        )
+        for match in switch_matches:
+            task_ref = match.group(1).strip()
+            agent_match = self._fuzzy_match_agent(task_ref)
+
+            if agent_match:
+                agent_id, title, conf = agent_match
                 matches.append(TriggerMatch(
-                    type="complete",
-                    agent_id=None,  # Current agent
-                    agent_title=None,
-                    confidence=0.8,
-                    matched_text=re.search(pattern, input_lower, re.IGNORECASE).group(0),
-                    action_suggested="Mark current agent as complete"
+                    type="switch",
+                    agent_id=agent_id,
+                    agent_title=title,
+                    confidence=conf * 0.9,  # Reduce slightly for pattern match
+                    matched_text=match.group(0),
+                    action_suggested=f"Switch to [{agent_id}]: {title}"
                 ))
 
+        # Check complete patterns
+        match = (any(n in input_lower for n in self.COMPLETE_NEEDLES)
+                 and self._first_match(self.COMPLETE_RE, self.COMPLETE_EACH, input_lower))
+        if match:
+            matches.append(TriggerMatch(
+                type="complete",
+                agent_id=None,  # Current agent
+                agent_title=None,
+                confidence=0.8,
+                matched_text=match.group(0),
+                action_suggested="Mark current agent as complete"
+            ))
+
         # Check escalation patterns
-        for pattern in self.ESCALATE_PATTERNS:
-            if re.search(pattern, input_lower, re.IGNORECASE):
-                matches.append(TriggerMatch(
-                    type="escalate",
-                    agent_id=None,
-                    agent_title=None,
-                    confidence=0.7,
-                    matched_text=re.search(pattern, input_lower, re.IGNORECASE).group(0),
-                    action_suggested="Escalate priority of current or mentioned task"
-                ))
+        match = (any(n in input_lower for n in self.ESCALATE_NEEDLES)
+                 and self._first_match(self.ESCALATE_RE, self.ESCALATE_EACH, input_lower))
+        if match:
+            matches.append(TriggerMatch(
+                type="escalate",
+                agent_id=None,
+                agent_title=None,
+                confidence=0.7,
+                matched_text=match.group(0),
+                action_suggested="Escalate priority of current or mentioned task"
+            ))
 
         # Check pause patterns
-        for pattern in self.PAUSE_PATTERNS:
-            if re.search(pattern, input_lower, re.IGNORECASE):
-                matches.append(TriggerMatch(
-                    type="pause",
-                    agent_id=None,
-                    agent_title=None,
-                    confidence=0.8,
-                    matched_text=re.search(pattern, input_lower, re.IGNORECASE).group(0),
-                    action_suggested="Pause current agent"
-                ))
+        match = (any(n in input_lower for n in self.PAUSE_NEEDLES)
+                 and self._first_match(self.PAUSE_RE, self.PAUSE_EACH, input_lower))
+        if match:
+            matches.append(TriggerMatch(
+                type="pause",
+                agent_id=None,
+                agent_title=None,
+                confidence=0.8,
+                matched_text=match.group(0),
+                action_suggested="Pause current agent"
+            ))
 
         # Check for direct agent mentions (ID or title)
-        for agent in self._get_agents():
-            # Check ID mention
-            if agent["id"].lower() in input_lower:
+        for agent, kind in self._find_mentions(input_lower):
+            if kind == "id":
                 matches.append(TriggerMatch(
                     type="mention",
                     agent_id=agent["id"],
@@ -223,10 +446,7 @@ class TriggerDetector:
                     matched_text=agent["id"],
                     action_suggested=f"Agent [{agent['id']}] mentioned"
                 ))
-
-            # Check title mention (at least 3 words to avoid false positives)
-            title_lower = agent["title"].lower()
-            if len(title_lower.split()) >= 2 and title_lower in input_lower:
+            else:
                 matches.append(TriggerMatch(
                     type="mention",
                     agent_id=agent["id"],
@@ -236,19 +456,16 @@ class TriggerDetector:
                     action_suggested=f"Agent [{agent['id']}] mentioned by title"
                 ))
 
-        # Sort by confidence descending
-        matches.sort(key=lambda m: m.confidence, reverse=True)
-
-        # Remove duplicates (same agent, keep highest confidence)
-        seen_agents = set()
-        unique_matches = []
-        for m in matches:
+        # Remove duplicates (same agent, keep highest confidence, earliest on ties)
+        best: Dict[Tuple[str, Optional[str]], Tuple[int, TriggerMatch]] = {}
+        for i, m in enumerate(matches):
             key = (m.type, m.agent_id)
-            if key not in seen_agents:
-                seen_agents.add(key)
-                unique_matches.append(m)
+            current = best.get(key)
+            if current is None or m.confidence > current[1].confidence:
+                best[key] = (i, m)
 
-        return unique_matches
+        # Sort the survivors by confidence descending
+        return [m for _, m in sorted(best.values(), key=lambda e: (-e[1].confidence, e[0]))]
 
     def get_suggested_action(self, matches: List[TriggerMatch]) -> Optional[str]:
         """
@@ -267,10 +484,28 @@ class TriggerDetector:
         return top_match.action_suggested
 
 
+# Shared detectors, so repeated calls reuse config, index, agent list and embeddings
+_detector: Optional[TriggerDetector] = None
+_semantic_detector: Optional["SemanticTriggerDetector"] = None
+
+
+def _get_detector() -> TriggerDetector:
+    """Get the shared keyword trigger detector."""
+    global _detector
+    if _detector is None:
+        _detector = TriggerDetector()
+    return _detector
+
+
+def invalidate_agent_cache() -> None:
+    """Drop the shared detector's agent list, e.g. after agents are created or updated."""
+    if _detector is not None:
+        _detector.invalidate_agent_cache()
+
+
 def detect_triggers(user_input: str) -> List[TriggerMatch]:
     """Convenience function to detect triggers."""
-    detector = TriggerDetector()
-    return detector.detect(user_input)
+    return _get_detector().detect(user_input)
 
 
 def check_for_switch(user_input: str) -> Optional[str]:
@@ -301,23 +536,59 @@ class SemanticTriggerDetector:
         self.threshold = similarity_threshold
         self.embeddings = get_embeddings()
         self._agent_embeddings = {}
+        self._matrix_ids: Tuple[str, ...] = ()
+        self._matrix = None  # L2-normalized agent embeddings, one row per _matrix_ids entry
 
     def _get_agent_embedding(self, agent: Dict[str, Any]) -> Optional[List[float]]:
         """Get or compute embedding for an agent."""
-        agent_id = agent["id"]
-        if agent_id in self._agent_embeddings:
-            return self._agent_embeddings[agent_id]
-
-        if not self.embeddings:
-            return None
-
-        # Create text representation
-        text = f"{agent['title']} {agent.get('goal', '')}"
-        embedding = self.embeddings.embed(text)
-
-        if embedding:
-            self._agent_embeddings[agent_id] = embedding
-
+        return self._get_agent_embeddings([agent]).get(agent["id"])
+
+    def _get_agent_embeddings(self, agents: List[Dict[str, Any]]) -> Dict[str, List[float]]:
+        """Get embeddings for several agents, computing all misses in one batch."""
+        found = {}
+        misses = []  # (agent_id, cache key, text)
+        model = getattr(self.embeddings, "model", "")
+
+        for agent in agents:
+            agent_id = agent["id"]
+            embedding = self._agent_embeddings.get(agent_id)
+            if embedding is None:
+                # Create text representation
+                text = f"{agent['title']} {agent.get('goal', '')}"
+
+                # Reuse the vector from an earlier process while title and goal are unchanged
+                key = _embedding_key(model, text)
+                embedding = _load_embedding(key)
+                if embedding is None:
+                    misses.append((agent_id, key, text))
+                    continue
+                self._agent_embeddings[agent_id] = embedding
+            found[agent_id] = embedding
+
+        if misses and self.embeddings:
+            texts = [text for _, _, text in misses]
+            if hasattr(self.embeddings, "embed_batch"):
+                embeddings = self.embeddings.embed_batch(texts)
+            else:
+                embeddings = [self.embeddings.embed(text) for text in texts]
+            for (agent_id, key, _), embedding in zip(misses, embeddings):
+                if embedding:
+                    _store_embedding(key, embedding)
+                    self._agent_embeddings[agent_id] = embedding
+                    found[agent_id] = embedding
+
+        return found
+
+    def _get_input_embedding(self, user_input: str) -> Optional[List[float]]:
+        """Embed user input, reusing the vector when the same text comes up again."""
+        key = _embedding_key(getattr(self.embeddings, "model", ""), user_input)
+        embedding = _embedding_cache.get(key)
+        if embedding is None:
+            embedding = self.embeddings.embed(user_input)
+            if embedding:
+                if len(_embedding_cache) >= INPUT_EMBEDDING_CACHE_SIZE:
+                    _embedding_cache.clear()
+                _embedding_cache[key] = embedding
         return embedding
 
     def detect_semantic_match(self, user_input: str) -> Optional[Tuple[str, str, float]]:
@@ -330,22 +601,26 @@ class SemanticTriggerDetector:
             return None
 
         # Embed user input
-        input_embedding = self.embeddings.embed(user_input)
+        input_embedding = self._get_input_embedding(user_input)
         if not input_embedding:
             return None
 
+        # Embed all active agents
+        agents = [a for a in list_agents() if a.get("status") not in INACTIVE_STATUSES]
+        embeddings = self._get_agent_embeddings(agents)
+        candidates = [(a, embeddings[a["id"]]) for a in agents if a["id"] in embeddings]
+
+        if not candidates:
+            return None
+
+        if NUMPY_AVAILABLE:
+            return self._best_match_vectorized(input_embedding, candidates)
+
         # Compare to all active agents
         best_match = None
         best_score = 0.0
 
-        for agent in list_agents():
-            if agent.get("status") in ("completed", "cancelled"):
-                continue
-
-            agent_embedding = self._get_agent_embedding(agent)
-            if not agent_embedding:
-                continue
-
+        for agent, agent_embedding in candidates:
             similarity = cosine_sim(input_embedding, agent_embedding)
 
             if similarity > best_score and similarity > self.threshold:
@@ -354,6 +629,39 @@ class SemanticTriggerDetector:
 
         return best_match
 
+    def _best_match_vectorized(self, input_embedding: List[float],
+                               candidates: List[Tuple[Dict[str, Any], List[float]]]
+                               ) -> Optional[Tuple[str, str, float]]:
+        """Score all candidates with one matrix-vector product over normalized embeddings."""
+        # Mismatched dimensions score 0 in cosine_sim, so they can never match
+        dim = len(input_embedding)
+        candidates = [(agent, emb) for agent, emb in candidates if len(emb) == dim]
+        if not candidates:
+            return None
+
+        # The matrix is rebuilt only when the set of candidate agents changes
+        ids = tuple(agent["id"] for agent, _ in candidates)
+        if ids != self._matrix_ids:
+            matrix = np.asarray([emb for _, emb in candidates], dtype=np.float64)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._matrix = matrix / norms
+            self._matrix_ids = ids
+
+        query = np.asarray(input_embedding, dtype=np.float64)
+        norm = np.linalg.norm(query)
+        if not norm:
+            return None
+
+        sims = self._matrix @ (query / norm)
+        best = int(np.argmax(sims))
+        similarity = float(sims[best])
+        if similarity <= self.threshold:
+            return None
+
+        agent = candidates[best][0]
+        return (agent["id"], agent["title"], similarity)
+
     def enhance_triggers(self, user_input: str, keyword_matches: List[TriggerMatch]) -> List[TriggerMatch]:
         """
         Enhance keyword matches with semantic matches.
@@ -393,13 +701,19 @@ def detect_triggers_semantic(user_input: str) -> List[TriggerMatch]:
 
     Combines keyword and embedding-based matching.
     """
+    global _semantic_detector
+
     # Get keyword matches
-    detector = TriggerDetector()
-    keyword_matches = detector.detect(user_input)
+    keyword_matches = _get_detector().detect(user_input)
+
+    # Without an embedding backend there is nothing to enhance with
+    if get_embeddings() is None:
+        return keyword_matches
 
     # Enhance with semantic
-    semantic_detector = SemanticTriggerDetector()
-    return semantic_detector.enhance_triggers(user_input, keyword_matches)
+    if _semantic_detector is None:
+        _semantic_detector = SemanticTriggerDetector()
+    return _semantic_detector.enhance_triggers(user_input, keyword_matches)
 
 
 def check_for_switch_semantic(user_input: str) -> Optional[str]:
@@ -11,15 +11,56 @@ Created: 2026-01-30
 
 import json
 import os
+import random
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Any, Optional, Callable
+from typing import Any, Dict, Iterator, Optional, Callable, Tuple
 from dataclasses import dataclass
 import logging
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Files written by VersionedStore start with the _version key, so the version
+# can be read from the first bytes without parsing the whole document
+_VERSION_HEADER_RE = re.compile(rb'\A\s*\{\s*"_version"\s*:\s*(\d+)\s*,')
+_VERSION_HEADER_BYTES = 128
+
+# Retry backoff for update(): full jitter over an exponentially growing, capped window
+BACKOFF_BASE = 0.05  # seconds
+BACKOFF_CAP = 1.0  # seconds
+CONFLICT_EWMA_ALPHA = 0.3  # Weight of the latest outcome in a file's conflict rate
+
+
+def _dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Serialize to compact (or indented) UTF-8 JSON bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _stamp(st: os.stat_result) -> Tuple[int, int, int]:
+    """Identify one version of a file's contents; it changes on every replace."""
+    return (st.st_mtime_ns, st.st_ino, st.st_size)
+
 
 class VersionConflictError(Exception):
     """Raised when state version doesn't match expected."""
@@ -54,14 +95,24 @@ class VersionedState:
 class VersionedStore:
     """Versioned JSON file store with optimistic concurrency."""
 
-    def __init__(self, filepath: str):
+    # Per-file moving average of update attempts that hit a conflict (0.0-1.0),
+    # shared across instances so hot files back off harder than cold ones
+    _conflict_ewma: Dict[Path, float] = {}
+
+    # path -> (stat stamp, version) of the last contents read or written, so
+    # version checks on an unchanged file cost a single stat()
+    _version_cache: Dict[Path, Tuple[Tuple[int, int, int], int]] = {}
+
+    def __init__(self, filepath: str, pretty: bool = False):
         """
         Initialize store for a file.
 
         Args:
             filepath: Path to the JSON file (can use ~)
+            pretty: Write indented JSON instead of compact JSON
         """
         self.filepath = Path(filepath).expanduser()
+        self.pretty = pretty
 
     def read(self) -> VersionedState:
         """
@@ -78,8 +129,9 @@ class VersionedStore:
             )
 
         try:
-            with open(self.filepath) as f:
-                raw = json.load(f)
+            with open(self.filepath, 'rb') as f:
+                stamp = _stamp(os.fstat(f.fileno()))
+                raw = _loads(f.read())
         except (json.JSONDecodeError, IOError) as e:
             logger.warning(f"Failed to read {self.filepath}: {e}")
             return VersionedState(
@@ -90,18 +142,21 @@ class VersionedStore:
 
         # Handle legacy files without versioning
         if "_version" not in raw:
-            return VersionedState(
+            state = VersionedState(
                 version=0,
                 data=raw,
                 last_modified=raw.get("_last_modified", "")
             )
+        else:
+            state = VersionedState(
+                version=raw["_version"],
+                data=raw.get("data", {}),
+                last_modified=raw.get("_last_modified", ""),
+                modified_by=raw.get("_modified_by")
+            )
 
-        return VersionedState(
-            version=raw["_version"],
-            data=raw.get("data", {}),
-            last_modified=raw.get("_last_modified", ""),
-            modified_by=raw.get("_modified_by")
-        )
+        self._version_cache[self.filepath] = (stamp, state.version)
+        return state
 
     def write(
         self,
@@ -123,16 +178,16 @@ class VersionedStore:
         Raises:
             VersionConflictError: If versions don't match
         """
-        current = self.read()
+        current_version = self._read_version()
 
-        if current.version != expected_version:
+        if current_version != expected_version:
             raise VersionConflictError(
                 expected_version,
-                current.version,
+                current_version,
                 str(self.filepath)
             )
 
-        new_version = current.version + 1
+        new_version = current_version + 1
 
         state = {
             "_version": new_version,
@@ -141,20 +196,26 @@ class VersionedStore:
             "data": data
         }
 
-        # Ensure directory exists
-        self.filepath.parent.mkdir(parents=True, exist_ok=True)
-
         # Write atomically via temp file
         tmp_path = self.filepath.with_suffix('.tmp')
         try:
-            with open(tmp_path, 'w') as f:
-                json.dump(state, f, indent=2)
-            tmp_path.rename(self.filepath)
+            try:
+                f = open(tmp_path, 'wb')
+            except FileNotFoundError:
+                # Only the first write to a new location needs its directory made
+                self.filepath.parent.mkdir(parents=True, exist_ok=True)
+                f = open(tmp_path, 'wb')
+            with f:
+                f.write(_dumps(state, self.pretty))
+                f.flush()
+                stamp = _stamp(os.fstat(f.fileno()))
+            os.replace(tmp_path, self.filepath)
         except Exception as e:
             if tmp_path.exists():
                 tmp_path.unlink()
             raise
 
+        self._version_cache[self.filepath] = (stamp, new_version)
         logger.debug(f"Wrote version {new_version} to {self.filepath}")
         return new_version
 
@@ -162,7 +223,7 @@ class VersionedStore:
         self,
         updater: Callable[[Any], Any],
         modifier: str = None,
-        max_retries: int = 3
+        max_retries: int = 5
     ) -> Any:
         """
         Atomic update with automatic retry on conflict.
@@ -183,30 +244,105 @@ class VersionedStore:
                 current = self.read()
                 new_data = updater(current.data)
                 self.write(new_data, current.version, modifier)
+                self._record_attempt(conflict=False)
                 return new_data
             except VersionConflictError as e:
+                rate = self._record_attempt(conflict=True)
                 if attempt == max_retries - 1:
                     logger.error(f"Max retries exceeded for {self.filepath}")
                     raise
                 logger.warning(f"Version conflict, retrying ({attempt + 1}/{max_retries})")
-                time.sleep(0.1 * (attempt + 1))  # Exponential backoff
+                # Random sleep so contending writers don't retry in lockstep;
+                # the window widens with the file's recent conflict rate
+                window = BACKOFF_BASE * (1 + rate) * 2 ** attempt
+                time.sleep(random.uniform(0, min(BACKOFF_CAP, window)))
+
+    @contextmanager
+    def batch(self, modifier: str = None) -> Iterator[VersionedState]:
+        """
+        Group many changes into one read and one write.
+
+        Mutate the yielded state's data in place (or rebind it); it is
+        written back when the block exits without an exception:
+
+            with store.batch("agent-1") as state:
+                for key in keys:
+                    state.data[key] = state.data.get(key, 0) + 1
+
+        Raises:
+            VersionConflictError: If the file changed during the block.
+                Buffered changes cannot be replayed, so use update() for
+                changes that should retry automatically.
+        """
+        state = self.read()
+        yield state
+        state.version = self.write(state.data, state.version, modifier)
+
+    def _record_attempt(self, conflict: bool) -> float:
+        """Fold an update attempt into this file's conflict rate and return the new rate."""
+        previous = self._conflict_ewma.get(self.filepath, 0.0)
+        rate = previous + CONFLICT_EWMA_ALPHA * (float(conflict) - previous)
+        self._conflict_ewma[self.filepath] = rate
+        return rate
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        """Forget the conflict rates observed for all files."""
+        cls._conflict_ewma.clear()
+
+    def _read_version(self) -> int:
+        """
+        Read the current version from the file header.
+
+        Falls back to a full read for legacy or hand-edited files whose
+        first key is not _version. Unchanged files are answered from the
+        stat-keyed version cache without opening them.
+        """
+        try:
+            stamp = _stamp(os.stat(self.filepath))
+        except FileNotFoundError:
+            return 0
+        except OSError:
+            return self.read().version
+
+        cached = self._version_cache.get(self.filepath)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        try:
+            with open(self.filepath, 'rb') as f:
+                stamp = _stamp(os.fstat(f.fileno()))
+                head = f.read(_VERSION_HEADER_BYTES)
+        except FileNotFoundError:
+            return 0
+        except IOError:
+            return self.read().version
+
+        match = _VERSION_HEADER_RE.match(head)
+        if not match:
+            return self.read().version
+
+        version = int(match.group(1))
+        self._version_cache[self.filepath] = (stamp, version)
+        return version
 
     def get_version(self) -> int:
         """Get current version without full data read."""
-        return self.read().version
+        return self._read_version()
 
     def exists(self) -> bool:
         """Check if the file exists."""
         return self.filepath.exists()
 
 
-def migrate_to_versioned(filepath: str, backup: bool = True) -> int:
+def migrate_to_versioned(filepath: str, backup: bool = True, pretty: bool = False) -> int:
     """
     Migrate a legacy (non-versioned) file to versioned format.
 
     Args:
         filepath: Path to the file
         backup: Create backup before migration
+        pretty: Write indented JSON instead of compact JSON
 
     Returns:
         New version number (1)
@@ -216,9 +352,14 @@ def migrate_to_versioned(filepath: str, backup: bool = True) -> int:
     if not path.exists():
         return 0
 
-    with open(path) as f:
-        data = json.load(f)
+    with open(path, 'rb') as f:
+        data = _loads(f.read())
+
+    return _migrate_data(path, data, backup, pretty)
+
 
+def _migrate_data(path: Path, data: Any, backup: bool = True, pretty: bool = False) -> int:
+    """Migrate a file whose contents the caller has already parsed into data."""
     # Already versioned
     if "_version" in data:
         return data["_version"]
@@ -226,8 +367,8 @@ def migrate_to_versioned(filepath: str, backup: bool = True) -> int:
     # Create backup
     if backup:
         backup_path = path.with_suffix(f'.backup-{int(time.time())}')
-        with open(backup_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        with open(backup_path, 'wb') as f:
+            f.write(_dumps(data, pretty))
         logger.info(f"Created backup: {backup_path}")
 
     # Migrate
@@ -238,17 +379,37 @@ def migrate_to_versioned(filepath: str, backup: bool = True) -> int:
         "data": data
     }
 
-    with open(path, 'w') as f:
-        json.dump(versioned, f, indent=2)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(_dumps(versioned, pretty))
+    os.replace(tmp_path, path)
 
     logger.info(f"Migrated {path} to versioned format")
     return 1
 
 
+def _migrate_one(filepath: Path) -> str:
+    """Migrate one file for batch_migrate, returning the stats key it counts toward."""
+    try:
+        with open(filepath, 'rb') as f:
+            data = _loads(f.read())
+
+        if "_version" in data:
+            return "already_versioned"
+        _migrate_data(filepath, data)
+        return "migrated"
+    except Exception as e:
+        logger.warning(f"Failed to process {filepath}: {e}")
+        return "failed"
+
+
 def batch_migrate(directory: str, pattern: str = "*.json") -> dict:
     """
     Migrate all JSON files in a directory.
 
+    Files are processed on a thread pool, since the work is dominated by
+    file I/O that releases the GIL.
+
     Args:
         directory: Directory to scan
         pattern: Glob pattern for files
@@ -259,19 +420,10 @@ def batch_migrate(directory: str, pattern: str = "*.json") -> dict:
     dir_path = Path(directory).expanduser()
     stats = {"migrated": 0, "already_versioned": 0, "failed": 0}
 
-    for filepath in dir_path.glob(pattern):
-        try:
-            with open(filepath) as f:
-                data = json.load(f)
-
-            if "_version" in data:
-                stats["already_versioned"] += 1
-            else:
-                migrate_to_versioned(str(filepath))
-                stats["migrated"] += 1
-        except Exception as e:
-            logger.warning(f"Failed to process {filepath}: {e}")
-            stats["failed"] += 1
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for outcome in pool.map(_migrate_one, dir_path.glob(pattern)):
+            stats[outcome] += 1
 
     return stats
 
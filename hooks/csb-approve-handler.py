@@ -26,6 +26,7 @@ APPROVE_PATTERNS = [
     r"^\s*clear\s+taint\s*$",
     r"^\s*csb\s+clear\s*$",
 ]
+APPROVE_RE = re.compile("|".join(f"(?:{p})" for p in APPROVE_PATTERNS), re.IGNORECASE)
 
 
 def main():
@@ -50,23 +51,20 @@ def main():
     session_id = input_data.get("session_id", "unknown")
 
     # Check if this is an approval command
-    for pattern in APPROVE_PATTERNS:
-        if re.match(pattern, user_message.strip(), re.IGNORECASE):
-            # Check if session is actually tainted
-            taint_status = check_taint(session_id)
+    if APPROVE_RE.match(user_message.strip()):
+        # Check if session is actually tainted
+        taint_status = check_taint(session_id)
 
-            if taint_status["tainted"]:
-                # Clear the taint
-                success = clear_taint(session_id, cleared_by="user_command")
+        if taint_status["tainted"]:
+            # Clear the taint
+            success = clear_taint(session_id, cleared_by="user_command")
 
-                if success:
-                    print(f"[CSB] ✅ Session taint CLEARED. Write/Edit/Bash operations now allowed.", file=sys.stderr)
-                else:
-                    print(f"[CSB] ⚠️ Failed to clear taint. Try: rm /tmp/claude-csb-taint-{session_id}.json", file=sys.stderr)
+            if success:
+                print(f"[CSB] ✅ Session taint CLEARED. Write/Edit/Bash operations now allowed.", file=sys.stderr)
             else:
-                print(f"[CSB] ℹ️ Session not tainted. No action needed.", file=sys.stderr)
-
-            break
+                print(f"[CSB] ⚠️ Failed to clear taint. Try: rm /tmp/claude-csb-taint-{session_id}.json", file=sys.stderr)
+        else:
+            print(f"[CSB] ℹ️ Session not tainted. No action needed.", file=sys.stderr)
 
     sys.exit(0)
 
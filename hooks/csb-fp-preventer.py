@@ -31,6 +31,13 @@ FP_PATTERNS = [
     (re.compile(r'printf\s+.*\\x1b'), "printf with hex escape", "Write to file first"),
 ]
 
+# All patterns as one alternation (keeping each one's flags), so the common
+# no-match command is rejected in a single pass
+FP_ANY = re.compile("|".join(
+    f"(?i:{p.pattern})" if p.flags & re.IGNORECASE else f"(?:{p.pattern})"
+    for p, _, _ in FP_PATTERNS
+))
+
 
 def main():
     try:
@@ -46,11 +53,13 @@ def main():
     if not command:
         sys.exit(0)
 
-    # Check all patterns
+    # Check all patterns; alternation matches can overlap, so on a hit each
+    # pattern is still tested on its own
     matches = []
-    for pattern, desc, alt in FP_PATTERNS:
-        if pattern.search(command):
-            matches.append(f"{desc} -> {alt}")
+    if FP_ANY.search(command):
+        for pattern, desc, alt in FP_PATTERNS:
+            if pattern.search(command):
+                matches.append(f"{desc} -> {alt}")
 
     if matches:
         advice = "; ".join(matches[:3])  # Cap at 3 matches
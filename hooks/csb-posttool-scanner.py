@@ -14,7 +14,7 @@ import sys
 import os
 import re
 from datetime import datetime
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Set, Tuple, Any
 
 # Import taint manager for creating taint markers on HIGH/CRITICAL detection
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -35,13 +35,20 @@ try:
 except ImportError:
     SOURCE_CLASSIFIER_AVAILABLE = False
 
-# Load whitelist for per-tool overrides
+# Optional Hyperscan prefilter, loaded for large content only
+import csb_fast_scan
+
+# Whitelist for per-tool overrides (loaded on demand by load_whitelist)
 WHITELIST_PATH = os.path.expanduser("~/.claude/security/csb-whitelist.json")
-try:
-    with open(WHITELIST_PATH, 'r') as _f:
-        CSB_WHITELIST = json.load(_f)
-except (FileNotFoundError, json.JSONDecodeError):
-    CSB_WHITELIST = {}
+
+# Compiled scan patterns keyed by source text (see compile_pattern)
+_COMPILED_PATTERNS: Dict[str, "re.Pattern"] = {}
+
+# Append-only descriptor for LOG_PATH, opened on the first event
+_log_fd: Optional[int] = None
+
+# Parsed JSON files keyed by path, reused while the file's mtime is unchanged
+_JSON_CACHE: Dict[str, Tuple[int, Any]] = {}
 
 PROTECTED_TOOLS = {"Read", "WebFetch"}
 CONFIG_PATH = os.path.expanduser("~/.claude/config/csb-patterns.json")
@@ -72,22 +79,27 @@ CONVERSATION_EXPORT_PATTERNS = [
     ".jsonl",
 ]
 
+# Magic numbers of images and archives (see is_binary_format)
+BINARY_MAGIC = (
+    b"\x89PNG\r\n\x1a\n",  # PNG
+    b"\xff\xd8\xff",  # JPEG
+    b"GIF87a", b"GIF89a",  # GIF
+    b"PK\x03\x04",  # ZIP (also docx/xlsx/jar)
+)
+
+# Single C-level checks instead of Python loops over the lists above
+TAINT_WHITELIST_PREFIXES = tuple(TAINT_WHITELIST)
+CONVERSATION_EXPORT_RE = re.compile("|".join(map(re.escape, CONVERSATION_EXPORT_PATTERNS)))
+
 
 def is_whitelisted(source: str) -> bool:
     """Check if source path is in the taint whitelist."""
-    expanded = os.path.expanduser(source)
-    for trusted_path in TAINT_WHITELIST:
-        if expanded.startswith(trusted_path):
-            return True
-    return False
+    return os.path.expanduser(source).startswith(TAINT_WHITELIST_PREFIXES)
 
 
 def is_conversation_export(source: str) -> bool:
     """Check if source path looks like a conversation export file."""
-    for pattern in CONVERSATION_EXPORT_PATTERNS:
-        if pattern in source:
-            return True
-    return False
+    return CONVERSATION_EXPORT_RE.search(source) is not None
 
 # Fallback patterns if config file is missing
 DEFAULT_PATTERNS = {
@@ -122,12 +134,39 @@ DEFAULT_PATTERNS = {
 
 DEFAULT_THRESHOLDS = {"LOW": 0, "MEDIUM": 3, "HIGH": 6, "CRITICAL": 9}
 
+# Counting stops here; far past any threshold, it only bounds pathological patterns
+MAX_MATCHES_PER_PATTERN = 1000
+
+
+def load_json_cached(path: str) -> Any:
+    """
+    Parse a JSON file, reusing the last result while its mtime is unchanged.
+
+    Raises the same errors as open() and json.loads().
+    """
+    mtime_ns = os.stat(path).st_mtime_ns
+    cached = _JSON_CACHE.get(path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+
+    with open(path, 'rb') as f:
+        data = json.loads(f.read())
+    _JSON_CACHE[path] = (mtime_ns, data)
+    return data
+
+
+def load_whitelist() -> Dict[str, Any]:
+    """Load the CSB whitelist, or an empty one if missing or invalid."""
+    try:
+        return load_json_cached(WHITELIST_PATH)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
 
 def load_config() -> Dict[str, Any]:
     """Load pattern configuration from file or use defaults."""
     try:
-        with open(CONFIG_PATH, 'r') as f:
-            return json.load(f)
+        return load_json_cached(CONFIG_PATH)
     except (FileNotFoundError, json.JSONDecodeError):
         return {
             "categories": DEFAULT_PATTERNS,
@@ -135,34 +174,77 @@ def load_config() -> Dict[str, Any]:
         }
 
 
-def scan_content(content: str, config: Dict[str, Any]) -> Tuple[List[Dict], int]:
+def compile_pattern(pattern: str) -> "re.Pattern":
+    """Compile a CSB pattern once per process; raises re.error if invalid."""
+    compiled = _COMPILED_PATTERNS.get(pattern)
+    if compiled is None:
+        compiled = _COMPILED_PATTERNS[pattern] = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+    return compiled
+
+
+def scan_content(
+    content: str,
+    config: Dict[str, Any],
+    stop_score: Optional[float] = None,
+    uncounted: Set[str] = frozenset()
+) -> Tuple[List[Dict], int]:
     """
     Scan content for injection patterns.
 
+    Heavier categories are scanned first. With stop_score set, the scan ends
+    as soon as the score from categories not in uncounted reaches it.
+
     Returns:
         Tuple of (matches list, total score)
     """
     matches = []
     total_score = 0
-
-    categories = config.get("categories", DEFAULT_PATTERNS)
-
-    for category_name, category_data in categories.items():
+    counted_score = 0
+
+    categories = sorted(
+        config.get("categories", DEFAULT_PATTERNS).items(),
+        key=lambda item: -item[1].get("weight", 1)
+    )
+
+    # Skip patterns the prefilter proved absent; re still does the counting
+    # (only worth its setup on large content)
+    hits = None
+    if len(content) >= csb_fast_scan.FAST_SCAN_MIN_SIZE:
+        csb_fast_scan.load_hyperscan()
+        all_patterns = [p for _, data in categories for p in data.get("patterns", [])]
+        hits = csb_fast_scan.hyperscan_prefilter(content, all_patterns)
+    index = -1
+
+    for category_name, category_data in categories:
         weight = category_data.get("weight", 1)
         patterns = category_data.get("patterns", [])
 
         for pattern in patterns:
+            index += 1
+            if hits is not None and index not in hits:
+                continue
             try:
-                found = re.findall(pattern, content, re.IGNORECASE | re.MULTILINE)
-                if found:
-                    match_count = len(found)
+                # Count without materializing every match; keep the first 3 as examples
+                match_count = 0
+                examples = []
+                for mo in compile_pattern(pattern).finditer(content):
+                    match_count += 1
+                    if match_count <= 3:
+                        examples.append(mo.group(0)[:30])
+                    elif match_count >= MAX_MATCHES_PER_PATTERN:
+                        break
+                if match_count:
                     matches.append({
                         "category": category_name,
                         "pattern": pattern[:50],  # Truncate for logging
                         "count": match_count,
-                        "examples": [str(f)[:30] for f in found[:3]]  # First 3 examples
+                        "examples": examples
                     })
                     total_score += weight * match_count
+                    if category_name not in uncounted:
+                        counted_score += weight * match_count
+                        if stop_score is not None and counted_score >= stop_score:
+                            return matches, total_score
             except re.error as e:
                 # Invalid regex, skip
                 log_event({
@@ -189,14 +271,19 @@ def score_to_level(score: int, thresholds: Dict[str, int]) -> str:
 def log_event(event_data: Dict[str, Any]) -> None:
     """Append event to unified security JSONL log file."""
     try:
-        os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
         event_data["ts"] = datetime.utcnow().isoformat() + "Z"
         event_data["component"] = "csb"
         event_data["direction"] = "inbound"  # Unified schema field
         event_data["pid"] = os.getpid()
 
-        with open(LOG_PATH, "a") as f:
-            f.write(json.dumps(event_data) + "\n")
+        line = (json.dumps(event_data) + "\n").encode("utf-8")
+
+        # One O_APPEND write per event keeps lines whole across concurrent hooks
+        global _log_fd
+        if _log_fd is None:
+            os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)  # Once per process
+            _log_fd = os.open(LOG_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        os.write(_log_fd, line)
     except (IOError, OSError):
         # Silent fail - don't break the hook
         pass
@@ -231,19 +318,30 @@ def output_warning(level: str, score: int, source: str, matches: List[Dict]) ->
                 print(f"[CSB]   - {match['category']}: '{examples[0]}'...", file=sys.stderr)
 
 
-def read_file_content(file_path: str, max_bytes: int = 500000) -> str:
+def read_file_bytes(file_path: str, max_bytes: int = 500000) -> bytes:
     """
-    Read file content for scanning.
+    Read raw file bytes for scanning.
     PostToolUse hooks don't receive tool_result, so we re-read the file.
     """
     try:
         expanded_path = os.path.expanduser(file_path)
-        if os.path.exists(expanded_path) and os.path.isfile(expanded_path):
-            with open(expanded_path, 'r', errors='ignore') as f:
+        if os.path.isfile(expanded_path):
+            with open(expanded_path, 'rb') as f:
                 return f.read(max_bytes)
     except (IOError, OSError, PermissionError):
         pass
-    return ""
+    return b""
+
+
+def is_binary_format(data: bytes) -> bool:
+    """
+    Check for formats whose raw bytes never reach the model as text.
+
+    Images are rendered by the Read tool and ZIP members are compressed, so
+    scanning their bytes can't find real injections. PDFs and executables
+    can carry readable text, so they are still scanned.
+    """
+    return data.startswith(BINARY_MAGIC) or (data[:4] == b"RIFF" and data[8:12] == b"WEBP")
 
 
 def main():
@@ -268,7 +366,18 @@ def main():
     if tool_name == "Read":
         source = tool_input.get("file_path", "unknown")
         # PostToolUse hooks don't receive tool_result, so re-read the file
-        content = read_file_content(source)
+        data = read_file_bytes(source)
+        if is_binary_format(data):
+            log_event({
+                "event": "scan_skipped_binary",
+                "level": "info",
+                "session_id": session_id,
+                "tool": tool_name,
+                "source": source,
+            })
+            sys.exit(0)
+        # One bulk decode; text-mode reads decode incrementally
+        content = data.decode('utf-8', errors='ignore')
     elif tool_name == "WebFetch":
         source = tool_input.get("url", "unknown")
         # Can't re-fetch web content; rely on PreToolUse defense
@@ -293,30 +402,41 @@ def main():
     config = load_config()
     thresholds = config.get("risk_thresholds", DEFAULT_THRESHOLDS)
 
-    # Scan content
-    matches, score = scan_content(content, config)
-
-    # Source-aware scoring (F7: CSB Hardening)
+    # Source-aware scoring (F7: CSB Hardening); known before the scan so it
+    # can stop once the adjusted score is certain to stay CRITICAL
     source_type = "unknown"
     trust_multiplier = 1.0
+    disabled_cats = set()
+    critical_margin = thresholds.get("CRITICAL", 9) * 2
     if SOURCE_CLASSIFIER_AVAILABLE:
         source_type = classify_source(tool_name, tool_input, "")
         trust_multiplier = get_trust_multiplier(source_type)
 
         # Apply per-tool overrides from whitelist
-        per_tool = CSB_WHITELIST.get("per_tool_overrides", {}).get(tool_name, {})
+        per_tool = load_whitelist().get("per_tool_overrides", {}).get(tool_name, {})
         # Check file extension overrides
         file_ext = os.path.splitext(source)[1] if source != "unknown" else ""
         override = per_tool.get(file_ext) or per_tool.get("*")
         disabled_cats = set(override.get("disable_categories", [])) if override else set()
 
+        stop_score = critical_margin / trust_multiplier if trust_multiplier > 0 else None
+    else:
+        # The conversation export reduction can cut any score, so scan it all
+        stop_score = None if is_conversation_export(source) else critical_margin
+
+    # Scan content
+    matches, score = scan_content(content, config, stop_score, disabled_cats)
+
+    if SOURCE_CLASSIFIER_AVAILABLE:
         # Zero out disabled categories and apply trust multiplier
+        weights = {
+            name: category.get("weight", 1)
+            for name, category in config.get("categories", DEFAULT_PATTERNS).items()
+        }
         adjusted_matches = []
         for m in matches:
             if m["category"] in disabled_cats:
-                score -= m["count"] * config.get("categories", DEFAULT_PATTERNS).get(
-                    m["category"], {}
-                ).get("weight", 1) * m["count"]
+                score -= m["count"] * weights.get(m["category"], 1)
                 m["category"] = f"{m['category']} (disabled: {override.get('reason', 'override')})"
                 m["count"] = 0
             adjusted_matches.append(m)
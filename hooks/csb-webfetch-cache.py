@@ -16,8 +16,9 @@ import os
 import re
 import hashlib
 import subprocess
+import time
 from datetime import datetime
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any
 
 # Import taint manager
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -27,11 +28,20 @@ try:
 except ImportError:
     TAINT_MANAGER_AVAILABLE = False
 
+# Optional RE2/Hyperscan support, loaded for large pages only
+import csb_fast_scan
+
 CACHE_DIR = "/tmp/claude-csb-cache"
 LOG_PATH = os.path.expanduser("~/.claude/logs/csb-events.jsonl")
 CONFIG_PATH = os.path.expanduser("~/.claude/config/csb-patterns.json")
 MAX_FETCH_SIZE = 500000  # 500KB max
 
+# How long a cached fetch of the same URL is reused instead of refetching (0 disables)
+try:
+    CACHE_TTL = int(os.environ.get("CSB_WEBFETCH_CACHE_TTL", "300"))
+except ValueError:
+    CACHE_TTL = 300
+
 # Default patterns (subset for web content)
 DEFAULT_PATTERNS = {
     "instruction_override": {
@@ -65,6 +75,19 @@ DEFAULT_PATTERNS = {
 
 DEFAULT_THRESHOLDS = {"LOW": 0, "MEDIUM": 3, "HIGH": 6, "CRITICAL": 9}
 
+# (category, weight, source pattern, compiled pattern, RE2 pattern or None)
+CompiledPattern = Tuple[str, int, str, "re.Pattern", Any]
+
+# All patterns fused into one alternation: (re pattern or None, RE2 pattern or None)
+Prefilter = Tuple[Optional["re.Pattern"], Any]
+
+# Numbered/named backreferences would point at the wrong group once fused
+_BACKREF_RE = re.compile(r"\\[1-9]|\(\?P=")
+
+# (config path, mtime_ns or None for defaults, fast) -> (config, compiled patterns, prefilter)
+_PATTERN_CACHE: Dict[Tuple[str, Optional[int], bool],
+                     Tuple[Dict[str, Any], List[CompiledPattern], Prefilter]] = {}
+
 
 def load_config() -> Dict[str, Any]:
     """Load pattern configuration."""
@@ -78,65 +101,162 @@ def load_config() -> Dict[str, Any]:
         }
 
 
+def compile_patterns(config: Dict[str, Any], fast: bool = False) -> List[CompiledPattern]:
+    """Compile every valid pattern in config (plus RE2 builds if fast); invalid ones are skipped."""
+    compiled = []
+    for category_name, category_data in config.get("categories", DEFAULT_PATTERNS).items():
+        weight = category_data.get("weight", 1)
+        for pattern in category_data.get("patterns", []):
+            try:
+                compiled.append((category_name, weight, pattern,
+                                 re.compile(pattern, re.IGNORECASE | re.MULTILINE),
+                                 csb_fast_scan.compile_re2(pattern) if fast else None))
+            except re.error:
+                pass
+    return compiled
+
+
+def compile_prefilter(patterns: List[CompiledPattern]) -> Prefilter:
+    """Fuse all patterns into one alternation that matches iff any pattern does.
+
+    Returns (None, None) when the patterns can't be fused safely.
+    """
+    sources = [pattern for _, _, pattern, _, _ in patterns]
+    if not sources or any(_BACKREF_RE.search(p) for p in sources):
+        return None, None
+
+    fused = "|".join(f"(?:{p})" for p in sources)
+    try:
+        fused_re = re.compile(fused, re.IGNORECASE | re.MULTILINE)
+    except re.error:
+        return None, None  # e.g. duplicate group names across patterns
+    fused_re2 = None
+    if all(compiled_re2 is not None for *_, compiled_re2 in patterns):
+        fused_re2 = csb_fast_scan.compile_re2(fused)
+    return fused_re, fused_re2
+
+
+def load_patterns(fast: bool = False) -> Tuple[Dict[str, Any], List[CompiledPattern], Prefilter]:
+    """
+    Load the config and its compiled patterns, redoing both only when the file changes.
+
+    With fast set, the fast engines are loaded and the RE2 builds and fused
+    prefilter are compiled too; that setup only pays off on large pages.
+    """
+    try:
+        key = (CONFIG_PATH, os.stat(CONFIG_PATH).st_mtime_ns, fast)
+    except OSError:
+        key = (CONFIG_PATH, None, fast)
+
+    cached = _PATTERN_CACHE.get(key)
+    if cached is None:
+        if fast:
+            csb_fast_scan.load_fast_engines()
+        config = load_config()
+        patterns = compile_patterns(config, fast)
+        prefilter = compile_prefilter(patterns) if fast else (None, None)
+        cached = _PATTERN_CACHE[key] = (config, patterns, prefilter)
+    return cached
+
+
 def url_to_hash(url: str) -> str:
     """Convert URL to safe filename hash."""
     return hashlib.sha256(url.encode()).hexdigest()[:16]
 
 
 def fetch_url_content(url: str, timeout: int = 10) -> str:
-    """Fetch URL content using curl."""
+    """Fetch URL content using curl, reusing a fresh cached copy if there is one."""
+    cache_file = f"{CACHE_DIR}/{url_to_hash(url)}.txt"
+
+    # Reuse a recent fetch of the same URL; CACHE_DIR is shared, so only
+    # files we wrote ourselves are trusted
     try:
-        os.makedirs(CACHE_DIR, exist_ok=True)
-        url_hash = url_to_hash(url)
-        cache_file = f"{CACHE_DIR}/{url_hash}.txt"
+        st = os.stat(cache_file)
+        if st.st_uid == os.getuid() and time.time() - st.st_mtime < CACHE_TTL:
+            with open(cache_file, "rb") as f:
+                return f.read(MAX_FETCH_SIZE).decode("utf-8", "ignore")
+    except OSError:
+        pass
 
-        # Use curl to fetch content
+    # curl writes to a temp file that only becomes the cache entry once the
+    # fetch completed; a timed-out or failed fetch must not be reused as a
+    # complete page by the TTL check above
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        try:
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            os.unlink(tmp_file)  # Left behind by an earlier process with our pid
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        os.close(fd)
+
+        # curl in a child process is cheaper than importing urllib.request
         result = subprocess.run(
-            ["curl", "-sL", "--max-time", str(timeout), "-o", cache_file, url],
+            ["curl", "-sL", "--max-time", str(timeout), "-o", tmp_file, url],
             capture_output=True,
-            text=True,
             timeout=timeout + 5
         )
 
         if result.returncode != 0:
             return ""
 
-        # Read cached content
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r', errors='ignore') as f:
-                return f.read(MAX_FETCH_SIZE)
+        # Read fetched content; a single decode of the bounded byte read. Not
+        # mmapped: scanning has to stay on str, since bytes patterns only
+        # fold case and match \s/\w for ASCII and would miss injection text
+        # that uses non-ASCII letters
+        with open(tmp_file, "rb") as f:
+            content = f.read(MAX_FETCH_SIZE).decode("utf-8", "ignore")
+        os.replace(tmp_file, cache_file)
+        return content
 
     except (subprocess.TimeoutExpired, OSError, IOError):
         pass
+    finally:
+        try:
+            os.unlink(tmp_file)
+        except OSError:
+            pass  # Already moved into place, or never created
 
     return ""
 
 
-def scan_content(content: str, config: Dict[str, Any]) -> Tuple[List[Dict], int]:
+def scan_content(content: str, patterns: List[CompiledPattern],
+                 prefilter: Prefilter = (None, None)) -> Tuple[List[Dict], int]:
     """Scan content for injection patterns."""
     matches = []
     total_score = 0
-
-    categories = config.get("categories", DEFAULT_PATTERNS)
-
-    for category_name, category_data in categories.items():
-        weight = category_data.get("weight", 1)
-        patterns = category_data.get("patterns", [])
-
-        for pattern in patterns:
-            try:
-                found = re.findall(pattern, content, re.IGNORECASE | re.MULTILINE)
-                if found:
-                    match_count = len(found)
-                    matches.append({
-                        "category": category_name,
-                        "pattern": pattern[:50],
-                        "count": match_count,
-                        "examples": [str(f)[:30] for f in found[:3]]
-                    })
-                    total_score += weight * match_count
-            except re.error:
-                pass
+    use_re2 = csb_fast_scan.RE2_AVAILABLE and not csb_fast_scan.RE2_UNSAFE_RE.search(content)
+
+    # One pass over the content settles the common clean case; matches of
+    # different patterns can overlap, so on a hit each one is still counted
+    hits = csb_fast_scan.hyperscan_prefilter(content, [pattern for _, _, pattern, _, _ in patterns])
+    if hits is None:
+        fused_re, fused_re2 = prefilter
+        fused = fused_re2 if use_re2 and fused_re2 is not None else fused_re
+        if fused is not None and not fused.search(content):
+            return matches, total_score
+
+    for index, (category_name, weight, pattern, compiled, compiled_re2) in enumerate(patterns):
+        if hits is not None and index not in hits:
+            continue
+        regex = compiled_re2 if use_re2 and compiled_re2 is not None else compiled
+
+        # Count without materializing every match; keep the first 3 as examples
+        match_count = 0
+        examples = []
+        for mo in regex.finditer(content):
+            match_count += 1
+            if match_count <= 3:
+                examples.append(mo.group(0)[:30])
+        if match_count:
+            matches.append({
+                "category": category_name,
+                "pattern": pattern[:50],
+                "count": match_count,
+                "examples": examples
+            })
+            total_score += weight * match_count
 
     return matches, total_score
 
@@ -155,13 +275,22 @@ def score_to_level(score: int, thresholds: Dict[str, int]) -> str:
 def log_event(event_data: Dict[str, Any]) -> None:
     """Log event to JSONL file."""
     try:
-        os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
         event_data["ts"] = datetime.utcnow().isoformat() + "Z"
         event_data["component"] = "csb-webfetch-cache"
         event_data["pid"] = os.getpid()
-
-        with open(LOG_PATH, "a") as f:
-            f.write(json.dumps(event_data) + "\n")
+        line = (json.dumps(event_data) + "\n").encode("utf-8")
+
+        # One O_APPEND write keeps lines whole across concurrent hooks
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        try:
+            fd = os.open(LOG_PATH, flags, 0o644)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)  # First event only
+            fd = os.open(LOG_PATH, flags, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
     except (IOError, OSError):
         pass
 
@@ -199,10 +328,11 @@ def main():
         sys.exit(0)
 
     # Load config and scan
-    config = load_config()
+    config, patterns, prefilter = load_patterns(fast=len(content) >= csb_fast_scan.FAST_SCAN_MIN_SIZE)
     thresholds = config.get("risk_thresholds", DEFAULT_THRESHOLDS)
-    matches, score = scan_content(content, config)
+    matches, score = scan_content(content, patterns, prefilter)
     level = score_to_level(score, thresholds)
+    categories = sorted({m["category"] for m in matches})
 
     # Log scan event
     log_event({
@@ -214,12 +344,11 @@ def main():
         "risk_score": score,
         "patterns_matched": len(matches),
         "content_length": len(content),
-        "categories": list(set(m["category"] for m in matches)) if matches else []
+        "categories": categories
     })
 
     # Create taint for HIGH/CRITICAL
     if level in ("HIGH", "CRITICAL") and TAINT_MANAGER_AVAILABLE:
-        categories = list(set(m["category"] for m in matches))
         examples = []
         for m in matches[:3]:
             examples.extend(m.get("examples", []))
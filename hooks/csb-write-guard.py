@@ -12,14 +12,6 @@ import json
 import sys
 import os
 
-# Import taint manager
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-try:
-    from csb_taint_manager import check_taint, format_block_message, format_ask_message
-    TAINT_MANAGER_AVAILABLE = True
-except ImportError:
-    TAINT_MANAGER_AVAILABLE = False
-
 
 def main():
     """Main entry point."""
@@ -35,9 +27,12 @@ def main():
     if tool_name != "Write":
         sys.exit(0)
 
-    # Skip if taint manager not available
-    if not TAINT_MANAGER_AVAILABLE:
-        sys.exit(0)
+    # Import taint manager only once there is a Write to guard
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    try:
+        from csb_taint_manager import check_taint, format_block_message, format_ask_message
+    except ImportError:
+        sys.exit(0)  # Skip if taint manager not available
 
     session_id = input_data.get("session_id", "unknown")
     tool_input = input_data.get("tool_input", {})
@@ -0,0 +1,137 @@
+"""
+Content Security Buffer - Fast Scan Engines
+
+Optional RE2 and Hyperscan support shared by the CSB scanner hooks.
+
+Both engines are imported on demand (load_re2/load_hyperscan), since their
+import and setup cost more than plain re saves on small content. They are
+only used on text where they agree with Python re (see the *_UNSAFE_RE
+patterns), so they can make a scan faster but never change its result.
+"""
+
+import os
+import re
+from typing import Any, List, Optional, Set
+
+# Imported by load_fast_engines(); None until then
+re2 = None
+hyperscan = None
+RE2_AVAILABLE: Optional[bool] = None
+HYPERSCAN_AVAILABLE: Optional[bool] = None
+
+HYPERSCAN_CACHE_DIR = os.path.expanduser("~/.claude/cache")  # Compiled pattern databases
+
+# Below this, plain re scans faster than the fast engines import and compile
+FAST_SCAN_MIN_SIZE = 32 * 1024
+
+# RE2 only agrees with re on ASCII text without \v or \x1c-\x1f (which re
+# counts as \s); re's case folding also matches e.g. dotless i against "i"
+RE2_UNSAFE_RE = re.compile(r"[^\x00-\x0a\x0c-\x1b\x20-\x7f]")
+
+# Likewise for Hyperscan, whose \s does include \v
+HYPERSCAN_UNSAFE_RE = re.compile(r"[^\x00-\x1b\x20-\x7f]")
+
+
+def load_re2() -> None:
+    """Import RE2 if installed (a few ms, so only on demand)."""
+    global re2, RE2_AVAILABLE
+    if RE2_AVAILABLE is not None:
+        return
+    try:
+        import re2
+        RE2_AVAILABLE = True
+    except ImportError:
+        RE2_AVAILABLE = False
+
+
+def load_hyperscan() -> None:
+    """Import Hyperscan if installed (a few ms, so only on demand)."""
+    global hyperscan, HYPERSCAN_AVAILABLE
+    if HYPERSCAN_AVAILABLE is not None:
+        return
+    try:
+        import hyperscan
+        HYPERSCAN_AVAILABLE = True
+    except ImportError:
+        HYPERSCAN_AVAILABLE = False
+
+
+def load_fast_engines() -> None:
+    """Import both RE2 and Hyperscan if installed."""
+    load_re2()
+    load_hyperscan()
+
+
+def compile_re2(pattern: str) -> Any:
+    """Compile pattern with RE2, or return None if RE2 is missing or can't express it."""
+    if not RE2_AVAILABLE:
+        return None
+    options = re2.Options()
+    options.log_errors = False  # Unsupported syntax (e.g. lookaround) falls back quietly
+    try:
+        return re2.compile(f"(?im){pattern}", options)
+    except re2.error:
+        return None
+
+
+def load_hyperscan_db(patterns: List[str]):
+    """
+    Get a Hyperscan database for patterns, compiling it only when they change.
+
+    Compiling takes ~100 ms, far longer than most scans, so the serialized
+    database is kept in HYPERSCAN_CACHE_DIR keyed by a hash of the patterns.
+    """
+    import hashlib  # Only needed once Hyperscan is in use; not on every scan
+
+    digest = hashlib.sha256("\0".join(patterns).encode()).hexdigest()[:16]
+    cache_path = os.path.join(HYPERSCAN_CACHE_DIR, f"csb-hyperscan-{digest}.db")
+    try:
+        with open(cache_path, "rb") as f:
+            db = hyperscan.loadb(f.read(), hyperscan.HS_MODE_BLOCK)
+        db.scratch = hyperscan.Scratch(db)  # Deserialized databases come without one
+        return db
+    except (IOError, OSError, hyperscan.error):
+        pass
+
+    flags = (hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_MULTILINE
+             | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_ALLOWEMPTY)
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[p.encode() for p in patterns],
+        ids=list(range(len(patterns))),
+        elements=len(patterns),
+        flags=[flags] * len(patterns),
+    )
+    try:
+        os.makedirs(HYPERSCAN_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(hyperscan.dumpb(db))
+        os.replace(tmp_path, cache_path)
+    except (IOError, OSError):
+        pass
+    return db
+
+
+def hyperscan_prefilter(content: str, patterns: List[str]) -> Optional[Set[int]]:
+    """
+    Find which patterns (by index) match anywhere in content with one Hyperscan pass.
+
+    Returns None when Hyperscan isn't loaded, can't compile the patterns,
+    or may disagree with re on this content, meaning every pattern must be run.
+    """
+    if not HYPERSCAN_AVAILABLE or not patterns or HYPERSCAN_UNSAFE_RE.search(content):
+        return None
+
+    try:
+        db = load_hyperscan_db(patterns)
+        hits = set()
+
+        def on_match(pattern_id, start, end, match_flags, context):
+            hits.add(pattern_id)
+
+        db.scan(content.encode(), match_event_handler=on_match)
+    except hyperscan.error:
+        # A pattern Hyperscan can't compile (e.g. lookaround); use re for all
+        return None
+    return hits
@@ -20,51 +20,73 @@ import json
 import os
 import sys
 import time
-from pathlib import Path
+from collections import deque
 
-CONFIG_PATH = Path.home() / ".claude" / "config" / "gemini-routing.json"
-STATE_FILE = Path("/tmp/gemini-routing-state.json")
+# Plain os.path strings: importing pathlib alone costs more than the hook's work
+CONFIG_PATH = os.path.expanduser("~/.claude/config/gemini-routing.json")
+STATE_FILE = "/tmp/gemini-routing-state.json"
 STATE_TTL = 10  # seconds
 
+# Parsed config, reused while the file's mtime is unchanged
+_config_cache = {"mtime": None, "config": None}
+
 
 def load_config():
-    """Load routing config."""
+    """Load routing config, reparsing only when the file changes."""
     try:
-        return json.loads(CONFIG_PATH.read_text())
-    except Exception:
+        mtime = os.stat(CONFIG_PATH).st_mtime_ns
+    except OSError:
         return {}
+    if mtime != _config_cache["mtime"]:
+        try:
+            with open(CONFIG_PATH) as f:
+                config = json.load(f)
+        except Exception:
+            return {}
+        _config_cache.update(mtime=mtime, config=config)
+    return _config_cache["config"]
 
 
 def load_state():
     """Load recent tool call state for counting."""
     try:
-        if STATE_FILE.exists():
-            data = json.loads(STATE_FILE.read_text())
-            # Prune old entries
-            now = time.time()
-            data["calls"] = [
-                c for c in data.get("calls", [])
-                if now - c.get("ts", 0) < STATE_TTL
-            ]
-            return data
+        with open(STATE_FILE) as f:
+            data = json.load(f)
+        # Prune old entries; calls are appended in time order, so the
+        # expired ones are at the front
+        now = time.time()
+        calls = deque(data.get("calls", []))
+        while calls and now - calls[0].get("ts", 0) >= STATE_TTL:
+            calls.popleft()
+        data["calls"] = calls
+        return data
     except Exception:
         pass
-    return {"calls": [], "suggested_this_session": False}
+    return {"calls": deque(), "suggested_this_session": False}
 
 
 def save_state(state):
-    """Save state atomically."""
+    """Save state in place with a single write.
+
+    The state is disposable (STATE_TTL), so a reader racing the write just
+    fails to parse it and load_state starts a fresh count.
+    """
     try:
-        tmp = str(STATE_FILE) + ".tmp"
-        with open(tmp, "w") as f:
-            json.dump(state, f)
-        os.rename(tmp, str(STATE_FILE))
+        data = json.dumps(state, separators=(",", ":"), default=list).encode()
+        fd = os.open(STATE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
     except Exception:
         pass
 
 
-def check_safety(config, tool_input, tool_name):
-    """Check safety blacklists. Returns True if safe to route."""
+def check_safety(config, tool_input, tool_name, input_str):
+    """Check safety blacklists. Returns True if safe to route.
+
+    input_str is the lowercased JSON form of tool_input (see main).
+    """
     safety = config.get("safety", {})
 
     # Check blacklisted tools
@@ -72,7 +94,6 @@ def check_safety(config, tool_input, tool_name):
         return False
 
     # Check paths for sensitive content
-    input_str = json.dumps(tool_input).lower()
     for keyword in safety.get("blacklist_keywords", []):
         if keyword.lower() in input_str:
             return False
@@ -91,7 +112,7 @@ def check_safety(config, tool_input, tool_name):
     return True
 
 
-def check_triggers(config, tool_name, tool_input, state):
+def check_triggers(config, tool_name, tool_input, state, input_str):
     """Check if current tool call triggers Gemini routing."""
     triggers = config.get("triggers", [])
     matched = []
@@ -126,9 +147,8 @@ def check_triggers(config, tool_name, tool_input, state):
         # User intent keywords (check in tool input text)
         elif name == "user_intent_bulk":
             keywords = trigger.get("keywords", [])
-            input_text = json.dumps(tool_input).lower()
             for kw in keywords:
-                if kw.lower() in input_text:
+                if kw.lower() in input_str:
                     matched.append(trigger)
                     break
 
@@ -158,8 +178,12 @@ def main():
     if env_var and os.environ.get(env_var) == "0":
         sys.exit(0)
 
+    # Serialized once for both the safety and the intent keyword checks.
+    # Default separators: keywords are matched against this exact text
+    input_str = json.dumps(tool_input).lower()
+
     # Safety check first
-    if not check_safety(config, tool_input, tool_name):
+    if not check_safety(config, tool_input, tool_name, input_str):
         sys.exit(0)
 
     # Load and update state
@@ -170,7 +194,7 @@ def main():
     })
 
     # Check triggers
-    matched = check_triggers(config, tool_name, tool_input, state)
+    matched = check_triggers(config, tool_name, tool_input, state, input_str)
 
     # Don't suggest twice in same burst
     if matched and not state.get("suggested_this_session", False):